@@ -0,0 +1,76 @@
+"""add context_snapshots and dedupe ai_context_logs contexts
+
+Revision ID: df7bf22647bd
+Revises: e8bbae766498
+Create Date: 2026-10-17 10:15:00.000000
+
+Existing logs are backfilled: every distinct used_context is stored once in
+context_snapshots under sha256(jsonb::text), the rows reference it through
+context_hash and their inline copy is cleared. Space is made reusable by the
+VACUUM at the end; run VACUUM FULL ai_context_logs in a maintenance window
+to also return it to the operating system.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'df7bf22647bd'
+down_revision: Union[str, None] = 'e8bbae766498'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONTEXT_HASH_SQL = "encode(sha256(convert_to(used_context::jsonb::text, 'UTF8')), 'hex')"
+
+
+def upgrade() -> None:
+    op.create_table(
+        'context_snapshots',
+        sa.Column('hash', sa.String(64), nullable=False),
+        sa.Column('context', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column(
+        'ai_context_logs',
+        sa.Column('context_hash', sa.String(64), nullable=True)
+    )
+
+    # Backfill: one snapshot per distinct context, then point logs at it
+    op.execute(f"""
+        INSERT INTO context_snapshots (hash, context, created_at)
+        SELECT {CONTEXT_HASH_SQL}, used_context::jsonb, min(created_at)
+        FROM ai_context_logs
+        WHERE used_context IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (hash) DO NOTHING
+    """)
+    op.execute(f"""
+        UPDATE ai_context_logs
+        SET context_hash = {CONTEXT_HASH_SQL}, used_context = NULL
+        WHERE used_context IS NOT NULL
+    """)
+
+    op.create_foreign_key(
+        'fk_ai_context_logs_context_hash',
+        'ai_context_logs', 'context_snapshots',
+        ['context_hash'], ['hash'],
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute("VACUUM ANALYZE ai_context_logs")
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE ai_context_logs AS l
+        SET used_context = s.context
+        FROM context_snapshots AS s
+        WHERE l.context_hash = s.hash
+    """)
+    op.drop_constraint('fk_ai_context_logs_context_hash', 'ai_context_logs', type_='foreignkey')
+    op.drop_column('ai_context_logs', 'context_hash')
+    op.drop_table('context_snapshots')
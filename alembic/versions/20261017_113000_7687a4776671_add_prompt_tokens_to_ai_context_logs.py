@@ -0,0 +1,29 @@
+"""add prompt_tokens to ai_context_logs
+
+Revision ID: 7687a4776671
+Revises: df7bf22647bd
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7687a4776671'
+down_revision: Union[str, None] = 'df7bf22647bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'ai_context_logs',
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('ai_context_logs', 'prompt_tokens')
@@ -0,0 +1,159 @@
+"""add daily rollup tables for Rya analytics
+
+Revision ID: e2b15fd8c9b2
+Revises: 7687a4776671
+Create Date: 2026-10-17 13:00:00.000000
+
+The rollups are backfilled from the existing ai_context_logs in one pass
+over the table (questions are grouped with a copy of the normalization the
+application used when this revision was written, so backfilled and new
+counts line up). From then on they are updated in the transaction that
+inserts each batch of logs. Both tables are keyed by day, so reading a date
+range never touches the logs; ai_context_logs.created_at is already indexed
+(ix_ai_context_logs_created_at).
+
+The backfill needs the existing rows, so it is skipped when generating SQL
+offline (--sql); the rollups then only count logs written afterwards.
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, Sequence, Tuple, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b15fd8c9b2'
+down_revision: Union[str, None] = '7687a4776671'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_ROWS = 50000
+
+# Copies of the application's definitions at this revision, so the migration
+# keeps backfilling the same way whatever the application code becomes
+APOLOGY_PREFIX = "I apologize, but I'm having trouble processing your request right now."
+ABORTED_MARKER = "[stream aborted]"
+STOP_WORDS = frozenset(
+    """
+    a an the and or but of to in on at for with about from by as is are was were
+    be been being am do does did have has had can could would should will shall
+    may might must i me my we our you your he him his she her they them their it
+    its this that these those what which who whom whose how please tell show
+    give list any some all there here so just also very really
+    """.split()
+)
+_NON_WORD = re.compile(r"[^\w\s]+")
+STAT_COLUMNS = ("questions", "failed", "answer_chars", "ai_calls", "prompt_tokens")
+
+daily_stats = sa.table(
+    'ai_daily_stats',
+    sa.column('day', sa.Date()),
+    *(sa.column(c, sa.BigInteger()) for c in STAT_COLUMNS),
+)
+daily_questions = sa.table(
+    'ai_daily_questions',
+    sa.column('day', sa.Date()),
+    sa.column('question_hash', sa.String(64)),
+    sa.column('question', sa.Text()),
+    sa.column('count', sa.Integer()),
+)
+
+
+def question_hash(question: str) -> str:
+    words = _NON_WORD.sub(" ", unicodedata.normalize("NFKC", question).lower()).split()
+    normalized = " ".join([w for w in words if w not in STOP_WORDS] or words)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class Rollup:
+    """Increments of both rollup tables for a chunk of log rows."""
+
+    def __init__(self):
+        self.stats: Dict[Any, Dict[str, Any]] = {}
+        self.questions: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+
+    def add(self, row) -> None:
+        day = row["created_at"].date()
+        response = row["ai_response"]
+        stats = self.stats.setdefault(day, {"day": day, **{c: 0 for c in STAT_COLUMNS}})
+        stats["questions"] += 1
+        stats["failed"] += response.startswith(APOLOGY_PREFIX) or response.endswith(ABORTED_MARKER)
+        stats["answer_chars"] += len(response)
+        if row["prompt_tokens"] is not None:
+            stats["ai_calls"] += 1
+            stats["prompt_tokens"] += row["prompt_tokens"]
+
+        key = (day, question_hash(row["user_question"]))
+        entry = self.questions.setdefault(
+            key,
+            {"day": day, "question_hash": key[1], "question": row["user_question"].strip(), "count": 0},
+        )
+        entry["count"] += 1
+
+    def flush(self, conn) -> None:
+        if self.stats:
+            stmt = pg_insert(daily_stats)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['day'],
+                set_={c: daily_stats.c[c] + stmt.excluded[c] for c in STAT_COLUMNS},
+            )
+            conn.execute(stmt, list(self.stats.values()))
+        if self.questions:
+            # The wording of the first chunk that saw a question is kept
+            stmt = pg_insert(daily_questions)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['day', 'question_hash'],
+                set_={'count': daily_questions.c['count'] + stmt.excluded['count']},
+            )
+            conn.execute(stmt, list(self.questions.values()))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ai_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('questions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('answer_chars', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('ai_calls', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('prompt_tokens', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table(
+        'ai_daily_questions',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('question_hash', sa.String(64), nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'question_hash')
+    )
+
+    if context.is_offline_mode():
+        return
+
+    # Backfill in log order (so the first wording of each question is kept),
+    # flushing the increments every chunk to bound memory
+    conn = op.get_bind()
+    result = conn.execution_options(stream_results=True, yield_per=5000).execute(
+        sa.text(
+            "SELECT user_question, ai_response, prompt_tokens, created_at "
+            "FROM ai_context_logs ORDER BY created_at"
+        )
+    )
+    rollup, pending = Rollup(), 0
+    for row in result.mappings():
+        rollup.add(row)
+        pending += 1
+        if pending >= BACKFILL_CHUNK_ROWS:
+            rollup.flush(conn)
+            rollup, pending = Rollup(), 0
+    rollup.flush(conn)
+
+
+def downgrade() -> None:
+    op.drop_table('ai_daily_questions')
+    op.drop_table('ai_daily_stats')
@@ -0,0 +1,43 @@
+"""record clients of rya questions and share faq answers
+
+Revision ID: 3c9e51a0d7f4
+Revises: e2b15fd8c9b2
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e51a0d7f4'
+down_revision: Union[str, None] = 'e2b15fd8c9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'ai_context_logs',
+        sa.Column('client_hash', sa.String(length=32), nullable=True)
+    )
+    op.create_table(
+        'ai_faq_answers',
+        sa.Column('content_key', sa.String(length=32), nullable=False),
+        sa.Column('intent', sa.Text(), nullable=False),
+        sa.Column('question', sa.Text(), nullable=False),
+        sa.Column('answer', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_key', 'intent')
+    )
+    op.create_index(
+        op.f('ix_ai_faq_answers_created_at'), 'ai_faq_answers', ['created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_ai_faq_answers_created_at'), table_name='ai_faq_answers')
+    op.drop_table('ai_faq_answers')
+    op.drop_column('ai_context_logs', 'client_hash')
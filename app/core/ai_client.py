@@ -1,19 +1,270 @@
 """
-Gemini AI Client for Rya AI Assistant.
+AI provider layer for Rya AI Assistant.
+
+``AIProvider`` holds what every backend shares (prompt assembly, bounded
+concurrency, deadlines and error mapping); subclasses only implement the raw
+model calls. ``get_ai_provider()`` returns the backend selected by
+``AI_PROVIDER``.
 """
 
-import google.generativeai as genai
-from typing import Optional
+import asyncio
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.prompts.rya_system_prompt import RYA_PROMPT_TEMPLATE
+
+SIZE_BUCKETS = (256, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+call_seconds = metrics.histogram(
+    "rya_ai_call_seconds",
+    "Duration of model calls, including time waiting for a slot",
+    labelnames=("provider", "outcome"),
+)
+first_fragment_seconds = metrics.histogram(
+    "rya_ai_first_fragment_seconds",
+    "Time until a streamed model call produced its first fragment",
+    labelnames=("provider",),
+)
+prompt_chars = metrics.histogram(
+    "rya_ai_prompt_chars",
+    "Size of prompts sent to the model, in characters",
+    labelnames=("provider",),
+    buckets=SIZE_BUCKETS,
+)
+response_chars = metrics.histogram(
+    "rya_ai_response_chars",
+    "Size of model responses, in characters",
+    labelnames=("provider",),
+    buckets=SIZE_BUCKETS,
+)
+call_retries = metrics.counter(
+    "rya_ai_retries_total",
+    "Model calls retried after a failed attempt",
+    labelnames=("provider",),
+)
+call_hedges = metrics.counter(
+    "rya_ai_hedged_calls_total",
+    "Model calls duplicated because the first attempt was slow",
+    labelnames=("provider",),
+)
+
+
+class AIClientError(Exception):
+    """Raised when the AI backend cannot produce a response."""
+
+
+class AITimeoutError(AIClientError):
+    """Raised when a generation call exceeds its deadline."""
+
+
+class AIOverloadedError(AIClientError):
+    """Raised when too many generation calls are already waiting for a slot."""
+
+
+class AICircuitOpenError(AIClientError):
+    """Raised without calling the model while its circuit breaker is open."""
+
+
+class AIRejectedError(AIClientError):
+    """
+    Raised when the backend refuses a request for good (blocked content,
+    invalid request or credentials).
+
+    Retrying cannot help and the refusal says nothing about the backend's
+    health, so these are neither retried nor counted by the circuit breaker.
+    """
+
+
+def _outcome(error: Optional[BaseException]) -> str:
+    if error is None:
+        return "ok"
+    if isinstance(error, (AITimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, AIOverloadedError):
+        return "overloaded"
+    if isinstance(error, AICircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, AIRejectedError):
+        return "rejected"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    return "error"
+
+
+class AIProvider(ABC):
+    """
+    Base class for AI backends.
+
+    Subclasses implement ``_generate`` and ``_stream``, and may override
+    ``_classify`` to tell permanent backend errors from transient ones;
+    timeouts, the concurrency limit, retries, hedging, the circuit breaker
+    and error mapping are applied here for all of them.
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        timeout: float = settings.GEMINI_TIMEOUT_SECONDS,
+        max_concurrency: int = settings.GEMINI_MAX_CONCURRENCY,
+        max_queue: int = settings.GEMINI_MAX_QUEUE,
+        max_retries: int = settings.AI_MAX_RETRIES,
+        retry_backoff: float = settings.AI_RETRY_BACKOFF_SECONDS,
+        hedge_after: float = settings.AI_HEDGE_AFTER_SECONDS,
+        breaker_threshold: int = settings.AI_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset: float = settings.AI_BREAKER_RESET_SECONDS,
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.hedge_after = hedge_after
+        self.breaker = CircuitBreaker(self.name, breaker_threshold, breaker_reset)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+
+    @staticmethod
+    def _build_prompt(user_question: str, context: str, system_prompt: str) -> str:
+        """Assemble the full prompt sent to the model."""
+        return RYA_PROMPT_TEMPLATE.format(
+            system_prompt=system_prompt,
+            context=context,
+            user_question=user_question,
+        )
+
+    @abstractmethod
+    async def _generate(self, prompt: str) -> str:
+        """Return the model's complete answer to ``prompt``."""
+
+    @abstractmethod
+    def _stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the model's answer to ``prompt`` as text fragments."""
+
+    def _classify(self, error: Exception) -> AIClientError:
+        """
+        Map an exception raised by the backend to an ``AIClientError``.
+
+        Errors are treated as transient (retried, counted by the circuit
+        breaker) unless mapped to ``AIRejectedError``.
+        """
+        if isinstance(error, AIClientError):
+            return error
+        return AIClientError(str(error))
+
+    @asynccontextmanager
+    async def _slot(self, timeout: Optional[float] = None):
+        """
+        Hold one of the bounded generation slots.
+
+        Callers beyond ``max_concurrency`` wait in line (for at most
+        ``timeout`` seconds); once ``max_queue`` callers are already waiting,
+        new ones are rejected immediately instead of piling up coroutines on
+        the event loop.
+        """
+        if self._queued >= self.max_queue:
+            raise AIOverloadedError("Too many questions are waiting for an answer")
+
+        # Not wait_for: before Python 3.12 it can lose a permit granted just
+        # as the timeout cancels the acquire
+        acquired = False
+        self._queued += 1
+        try:
+            async with asyncio.timeout(timeout):
+                await self._slots.acquire()
+                acquired = True
+        except BaseException:
+            if acquired:
+                self._slots.release()
+            raise
+        finally:
+            self._queued -= 1
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
 
+    async def _generate_in_slot(self, prompt: str) -> str:
+        async with self._slot():
+            try:
+                return await self._generate(prompt)
+            except AIClientError:
+                raise
+            except Exception as e:
+                raise self._classify(e) from e
 
-class GeminiClient:
-    """Client for interacting with Google Gemini AI."""
+    async def _generate_hedged(self, prompt: str) -> str:
+        """
+        Run one attempt; if it has not finished after ``hedge_after`` seconds
+        and a slot is free, start a duplicate and take whichever answers first.
+        """
+        if self.hedge_after <= 0:
+            return await self._generate_in_slot(prompt)
+
+        tasks = {asyncio.ensure_future(self._generate_in_slot(prompt))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done and not self._slots.locked():
+                call_hedges.inc(provider=self.name)
+                tasks.add(asyncio.ensure_future(self._generate_in_slot(prompt)))
+
+            errors = []
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    def __init__(self):
-        """Initialize the Gemini client."""
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    async def _generate_with_retries(self, prompt: str) -> str:
+        """Retry transient failures with exponential backoff and full jitter."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._generate_hedged(prompt)
+            except (AIOverloadedError, AIRejectedError):
+                raise
+            except AIClientError:
+                if attempt == self.max_retries:
+                    raise
+            call_retries.inc(provider=self.name)
+            await asyncio.sleep(random.uniform(0, self.retry_backoff * 2 ** attempt))
+
+    def _admit(self) -> None:
+        """Fail fast while the circuit breaker is open."""
+        try:
+            self.breaker.allow()
+        except CircuitOpenError as e:
+            call_seconds.observe(0.0, provider=self.name, outcome="circuit_open")
+            raise AICircuitOpenError(
+                "The AI service is temporarily unavailable, please try again shortly"
+            ) from e
+
+    def _record(self, error: Optional[BaseException]) -> None:
+        """Report a call's outcome to the circuit breaker."""
+        if error is None:
+            self.breaker.record_success()
+        elif isinstance(
+            error, (AIOverloadedError, AIRejectedError, asyncio.CancelledError, GeneratorExit)
+        ):
+            # Says nothing about the backend's health
+            self.breaker.record_ignored()
+        else:
+            self.breaker.record_failure()
 
     async def generate_response(
         self,
@@ -22,45 +273,215 @@ class GeminiClient:
         system_prompt: str,
     ) -> str:
         """
-        Generate AI response using Gemini.
-        
+        Generate an AI response.
+
+        The call never blocks the event loop, is bounded by ``timeout``
+        (including time spent waiting for a slot and retries) and is
+        cancelled together with the awaiting task. While the circuit breaker
+        is open it fails immediately.
+
         Args:
             user_question: The user's question
             context: Relevant data from the portfolio database
             system_prompt: System instructions for the AI
-            
+
         Returns:
             AI-generated response string
+
+        Raises:
+            AIClientError: If the model fails, times out, is overloaded or
+                rejects the request
         """
+        self._admit()
+        full_prompt = self._build_prompt(user_question, context, system_prompt)
+        prompt_chars.observe(len(full_prompt), provider=self.name)
+        started = time.perf_counter()
+        error = None
         try:
-            full_prompt = f"""
-{system_prompt}
+            response = await asyncio.wait_for(
+                self._generate_with_retries(full_prompt), timeout=self.timeout
+            )
+            response_chars.observe(len(response), provider=self.name)
+            return response
+        except asyncio.TimeoutError as e:
+            error = e
+            raise AITimeoutError(
+                f"No response from the model within {self.timeout:g} seconds"
+            ) from e
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._record(error)
+            call_seconds.observe(
+                time.perf_counter() - started, provider=self.name, outcome=_outcome(error)
+            )
 
-PORTFOLIO DATA CONTEXT:
-{context}
+    async def stream_response(
+        self,
+        user_question: str,
+        context: str,
+        system_prompt: str,
+    ) -> AsyncIterator[str]:
+        """
+        Stream an AI response as text fragments.
 
-USER QUESTION:
-{user_question}
+        The whole stream shares one ``timeout`` deadline. Closing or
+        cancelling the iterator cancels the underlying model call and frees
+        its slot. Streams go through the circuit breaker but are not retried
+        or hedged, since fragments may already have been delivered.
 
-INSTRUCTIONS:
-- Answer ONLY using the portfolio data provided above
-- If the information is not available in the context, politely say so
-- Be helpful, professional, and concise
-- Speak as if you know the portfolio owner personally
-- Never make up information that isn't in the context
+        Yields:
+            Response text fragments in generation order
 
-RESPONSE:
-"""
-            response = self.model.generate_content(full_prompt)
-            return response.text
+        Raises:
+            AIClientError: If the model fails, times out, is overloaded or
+                rejects the request
+        """
+        self._admit()
+        full_prompt = self._build_prompt(user_question, context, system_prompt)
+        prompt_chars.observe(len(full_prompt), provider=self.name)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.timeout
+        size = 0
+        error = None
+
+        def remaining() -> float:
+            return max(deadline - loop.time(), 0)
+
+        try:
+            async with self._slot(timeout=remaining()):
+                chunks = self._stream(full_prompt).__aiter__()
+                try:
+                    while True:
+                        try:
+                            text = await asyncio.wait_for(chunks.__anext__(), timeout=remaining())
+                        except StopAsyncIteration:
+                            break
+                        if text:
+                            if not size:
+                                first_fragment_seconds.observe(loop.time() - started, provider=self.name)
+                            size += len(text)
+                            yield text
+                finally:
+                    await chunks.aclose()
+        except asyncio.TimeoutError as e:
+            error = e
+            raise AITimeoutError(
+                f"No response from the model within {self.timeout:g} seconds"
+            ) from e
+        except AIClientError as e:
+            error = e
+            raise
+        except (asyncio.CancelledError, GeneratorExit) as e:
+            error = asyncio.CancelledError() if isinstance(e, GeneratorExit) else e
+            raise
         except Exception as e:
-            return f"I apologize, but I'm having trouble processing your request right now. Error: {str(e)}"
+            error = self._classify(e)
+            raise error from e
+        finally:
+            self._record(error)
+            response_chars.observe(size, provider=self.name)
+            call_seconds.observe(loop.time() - started, provider=self.name, outcome=_outcome(error))
+
+    def stats(self) -> Dict[str, object]:
+        """Return current in-flight and queued generation counts and breaker state."""
+        return {
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "circuit": self.breaker.stats(),
+        }
+
+
+class GeminiProvider(AIProvider):
+    """Provider backed by Google Gemini."""
+
+    name = "gemini"
+
+    def __init__(self, model_name: str = settings.GEMINI_MODEL, **kwargs):
+        super().__init__(**kwargs)
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def model(self):
+        """The Gemini model, configured on first use rather than at import."""
+        if self._model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def _classify(self, error: Exception) -> AIClientError:
+        """
+        Rate limits, aborted calls and server errors are transient; other 4xx
+        responses (bad request, invalid API key, permission denied) and
+        blocked prompts or answers are rejections.
+        """
+        from google.api_core import exceptions as api_exceptions
+        from google.generativeai.types import BlockedPromptException, StopCandidateException
+
+        if isinstance(
+            error,
+            (api_exceptions.TooManyRequests, api_exceptions.Aborted, api_exceptions.Cancelled),
+        ):
+            return AIClientError(str(error))
+        if isinstance(
+            error,
+            (
+                api_exceptions.ClientError,
+                BlockedPromptException,
+                StopCandidateException,
+                # response.text of an answer blocked by the safety filters
+                ValueError,
+            ),
+        ):
+            return AIRejectedError(str(error))
+        return super()._classify(error)
+
+    async def _generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(
+            prompt,
+            request_options={"timeout": self.timeout},
+        )
+        return response.text
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(
+            prompt,
+            stream=True,
+            request_options={"timeout": self.timeout},
+        )
+        async for chunk in response:
+            try:
+                yield chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata only)
+                continue
+
+
+def create_ai_provider(name: Optional[str] = None) -> AIProvider:
+    """Create the provider registered under ``name`` (default ``AI_PROVIDER``)."""
+    name = name or settings.AI_PROVIDER
+    if name == "gemini":
+        return GeminiProvider()
+    if name == "fake":
+        from app.core.fake_ai_provider import FakeProvider
+
+        return FakeProvider()
+    raise ValueError(f"Unknown AI provider: {name!r}")
 
 
-# Singleton instance
-gemini_client = GeminiClient()
+_provider: Optional[AIProvider] = None
 
 
-def get_gemini_client() -> GeminiClient:
-    """Get the Gemini client instance."""
-    return gemini_client
+def get_ai_provider() -> AIProvider:
+    """Get the configured AI provider instance."""
+    global _provider
+    if _provider is None:
+        _provider = create_ai_provider()
+    return _provider
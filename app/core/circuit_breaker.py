@@ -0,0 +1,112 @@
+"""
+Circuit breaker that stops calling a failing backend for a while.
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+circuit_state = metrics.gauge(
+    "rya_ai_circuit_state",
+    "Circuit breaker state per provider (0 closed, 1 half-open, 2 open)",
+    labelnames=("provider",),
+)
+circuit_transitions = metrics.counter(
+    "rya_ai_circuit_transitions_total",
+    "Circuit breaker state changes per provider",
+    labelnames=("provider", "state"),
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuit open, retry in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are refused for ``reset_timeout`` seconds. Then a single probe call is let
+    through (half-open): its success closes the circuit, its failure opens it
+    again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        circuit_state.set(_STATE_VALUES[CLOSED], provider=name)
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("AI provider %s circuit %s -> %s", self.name, self.state, state)
+        self.state = state
+        circuit_state.set(_STATE_VALUES[state], provider=self.name)
+        circuit_transitions.inc(provider=self.name, state=state)
+
+    def allow(self, now: Optional[float] = None) -> None:
+        """
+        Admit a call or raise ``CircuitOpenError``.
+
+        Every admitted call must be followed by ``record_success`` or
+        ``record_failure`` (or ``record_ignored`` if its outcome says nothing
+        about the backend's health).
+        """
+        if not self.enabled or self.state == CLOSED:
+            return
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN:
+            retry_after = self._opened_at + self.reset_timeout - now
+            if retry_after > 0:
+                raise CircuitOpenError(retry_after)
+            self._transition(HALF_OPEN)
+        if self._probing:
+            raise CircuitOpenError(self.reset_timeout)
+        self._probing = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._probing = False
+        self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.enabled and (self.state == HALF_OPEN or self.failures >= self.failure_threshold):
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def record_ignored(self) -> None:
+        self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+        }
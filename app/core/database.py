@@ -2,23 +2,187 @@
 Database configuration and session management.
 """
 
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import Request
+from sqlalchemy import Engine, Select, event, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 from app.core.config import settings
+from app.core.db_pool import InstrumentedPool, PoolController, instrument
+from app.core.replicas import ReplicaPool
+
+# Session.info flag: reads of this session may go to a read replica
+READ_REPLICA = "read_replica"
+# Session.info key: replica engine (or None for the primary) of the current transaction
+_REPLICA_BIND = "replica_bind"
+# Session.info flag: the current transaction flushed ORM changes
+_WROTE = "wrote"
+# Session.info flag: the session only reads; writes raise ReadOnlySessionError
+READ_ONLY = "read_only"
+
+# Requests whose handlers only read
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Connection options of read-only sessions, per DATABASE_READ_SESSION_MODE:
+# "autocommit" sends no BEGIN/COMMIT at all, "read_only" runs the reads in a
+# BEGIN READ ONLY transaction the server enforces. ORM writes are rejected in
+# both modes, but only "read_only" stops raw SQL (session.execute(text(...)))
+# from writing: under "autocommit" such a statement commits immediately
+READ_SESSION_OPTIONS = {
+    "autocommit": {"isolation_level": "AUTOCOMMIT"},
+    "read_only": {"postgresql_readonly": True},
+}
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Raised when a read-only session is asked to write."""
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def _connect_args(url: str) -> Dict[str, object]:
+    """
+    asyncpg prepared-statement settings.
+
+    Behind PgBouncer in transaction pooling mode (DATABASE_PGBOUNCER) a
+    connection's prepared statements may live on another server connection,
+    so nothing is cached and every statement gets a unique name.
+    """
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.DATABASE_PGBOUNCER:
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {"prepared_statement_cache_size": settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE}
+
+
+def _create_engine(url: str, name: str):
+    """Create an engine whose pool exports its metrics under ``name``."""
+    async_engine = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+        connect_args=_connect_args(url),
+        poolclass=InstrumentedPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_logging_name=name,
+    )
+    instrument(async_engine)
+    return async_engine
 
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# Optional read replicas
+replica_pool = ReplicaPool(
+    [
+        _create_engine(url, f"replica{index}")
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ],
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS,
+    check_timeout=settings.DATABASE_REPLICA_CHECK_TIMEOUT_SECONDS,
+    read_your_writes=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
 )
 
+# Optional adaptive sizing of the primary pool's overflow
+pool_controller = PoolController(
+    engine,
+    target_wait=settings.DATABASE_POOL_TARGET_WAIT_MS / 1000,
+    interval=settings.DATABASE_POOL_ADAPT_INTERVAL_SECONDS,
+    workers=settings.DATABASE_POOL_WORKERS,
+    reserved=settings.DATABASE_POOL_RESERVED_CONNECTIONS,
+)
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to a read replica when its
+    ``READ_REPLICA`` flag is set, and everything else to the primary.
+
+    One replica is used per transaction, so its reads are consistent with
+    each other. Once the transaction has written, it reads from the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = self._route(clause) or super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self.info.get(READ_ONLY):
+            return _read_only_bind(bind, self.info[READ_ONLY])
+        return bind
+
+    def _route(self, clause) -> Optional[Engine]:
+        if (
+            self.info.get(READ_REPLICA)
+            and replica_pool.enabled
+            and not self._flushing
+            and not self.info.get(_WROTE)
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            if _REPLICA_BIND not in self.info:
+                self.info[_REPLICA_BIND] = replica_pool.choose()
+            replica = self.info[_REPLICA_BIND]
+            if replica is not None:
+                return replica.sync_engine
+        return None
+
+
+# (engine, mode) -> engine sharing its pool, with the read session options
+_read_only_binds: Dict[Tuple[Engine, str], Engine] = {}
+
+
+def _read_only_bind(bind: Engine, mode: str) -> Engine:
+    key = (bind, mode)
+    if key not in _read_only_binds:
+        _read_only_binds[key] = bind.execution_options(**READ_SESSION_OPTIONS[mode])
+    return _read_only_binds[key]
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _reject_read_only_flush(session: Session, flush_context, instances) -> None:
+    if session.info.get(READ_ONLY) and (session.new or session.dirty or session.deleted):
+        raise ReadOnlySessionError("Cannot write in a read-only session")
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _reject_read_only_dml(state) -> None:
+    if state.session.info.get(READ_ONLY) and (state.is_insert or state.is_update or state.is_delete):
+        raise ReadOnlySessionError("Cannot write in a read-only session")
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_wrote(session: Session, flush_context) -> None:
+    session.info[_WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _end_routed_transaction(session: Session) -> None:
+    session.info.pop(_REPLICA_BIND, None)
+    if session.info.pop(_WROTE, False):
+        replica_pool.mark_write()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_routed_transaction(session: Session) -> None:
+    session.info.pop(_REPLICA_BIND, None)
+    session.info.pop(_WROTE, None)
+
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -30,12 +194,36 @@ class Base(DeclarativeBase):
     pass
 
 
-async def get_db() -> AsyncSession:
+@contextmanager
+def replica_reads(session: AsyncSession) -> Iterator[None]:
+    """Let reads on ``session`` go to a read replica inside the block."""
+    previous = session.info.get(READ_REPLICA, False)
+    session.info[READ_REPLICA] = True
+    try:
+        yield
+    finally:
+        session.info[READ_REPLICA] = previous
+
+
+async def get_db(request: Request) -> AsyncSession:
     """
     Dependency to get database session.
-    Yields an async database session.
+    Yields an async database session; for read-only requests (GET) its
+    queries may be served by a read replica.
+
+    Unless ``DATABASE_READ_SESSION_MODE`` is ``off``, read-only requests get
+    a read-only session: no commit is issued and ORM writes raise
+    ``ReadOnlySessionError``. Raw SQL writes are refused by the server in
+    ``read_only`` mode only.
     """
+    read = request.method in READ_METHODS
+    mode = settings.DATABASE_READ_SESSION_MODE
     async with AsyncSessionLocal() as session:
+        session.info[READ_REPLICA] = read
+        if read and mode != "off":
+            session.info[READ_ONLY] = mode
+            yield session
+            return
         try:
             yield session
             await session.commit()
@@ -0,0 +1,249 @@
+"""
+Connection pool instrumentation and adaptive overflow sizing.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Deque, Dict, List, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+pool_wait_seconds = metrics.histogram(
+    "db_pool_wait_seconds",
+    "Time to check a connection out of the pool (queueing plus connecting)",
+    labelnames=("pool",),
+    buckets=POOL_WAIT_BUCKETS,
+)
+pool_timeouts = metrics.counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up waiting for a pooled connection",
+    labelnames=("pool",),
+)
+pool_checked_out = metrics.gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    labelnames=("pool",),
+)
+pool_overflow = metrics.gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size",
+    labelnames=("pool",),
+)
+pool_max_overflow = metrics.gauge(
+    "db_pool_max_overflow",
+    "Current limit on connections beyond the pool size",
+    labelnames=("pool",),
+)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that times every checkout and counts timeouts.
+
+    The pool is labelled by its ``logging_name`` (``pool_logging_name`` on
+    the engine). Recent wait times and the peak number of checked-out
+    connections are kept for ``PoolController``.
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.label = kw.get("logging_name") or "default"
+        self.recent_waits: Deque[float] = deque(maxlen=2048)
+        self.recent_timeouts = 0
+        self.peak_checked_out = 0
+        pool_max_overflow.set(self._max_overflow, pool=self.label)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc(pool=self.label)
+            self.recent_timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        pool_wait_seconds.observe(waited, pool=self.label)
+        self.recent_waits.append(waited)
+        pool_overflow.set(max(self.overflow(), 0), pool=self.label)
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        pool_overflow.set(max(self.overflow(), 0), pool=self.label)
+
+    @property
+    def max_overflow(self) -> int:
+        return self._max_overflow
+
+    def set_max_overflow(self, value: int) -> None:
+        """
+        Change how many connections may be opened beyond the pool size.
+
+        Lowering it closes surplus connections as they are returned.
+        """
+        self._max_overflow = value
+        pool_max_overflow.set(value, pool=self.label)
+
+    def take_window(self) -> Dict[str, object]:
+        """Return and reset the waits, timeouts and peak seen since the last call."""
+        window = {
+            "waits": list(self.recent_waits),
+            "timeouts": self.recent_timeouts,
+            "peak_checked_out": max(self.peak_checked_out, self.checkedout()),
+        }
+        self.recent_waits.clear()
+        self.recent_timeouts = 0
+        self.peak_checked_out = self.checkedout()
+        return window
+
+
+def instrument(engine: AsyncEngine) -> None:
+    """
+    Track checked-out connections of ``engine``'s pool from pool events.
+
+    The listeners look the pool up on every event, so they keep working
+    after ``dispose()`` replaces it.
+    """
+    sync_engine = engine.sync_engine
+    if not isinstance(sync_engine.pool, InstrumentedPool):
+        return
+
+    def on_checkout(*_args) -> None:
+        pool = sync_engine.pool
+        pool.peak_checked_out = max(pool.peak_checked_out, pool.checkedout())
+        pool_checked_out.inc(pool=pool.label)
+
+    def on_checkin(*_args) -> None:
+        pool_checked_out.dec(pool=sync_engine.pool.label)
+
+    event.listen(sync_engine, "checkout", on_checkout)
+    event.listen(sync_engine, "checkin", on_checkin)
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, object]:
+    pool = engine.sync_engine.pool
+    stats: Dict[str, object] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats["max_overflow"] = pool.max_overflow
+        stats["waits"] = pool_wait_seconds.count(pool=pool.label)
+        stats["timeouts"] = pool_timeouts.value(pool=pool.label)
+    return stats
+
+
+class PoolController:
+    """
+    Adjusts a pool's overflow limit from the checkout waits it observes.
+
+    Every ``interval`` seconds: if the 95th percentile wait exceeded
+    ``target_wait`` (or a checkout timed out) the limit grows by a quarter
+    (at least one); if waits stayed well under target and the pool never
+    used its last overflow connection, it shrinks by one. The limit never
+    exceeds this worker's share of the server's ``max_connections``:
+    ``(max_connections - reserved) / workers - pool_size``.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        target_wait: float,
+        interval: float,
+        workers: int,
+        reserved: int,
+    ):
+        self.engine = engine
+        self.target_wait = target_wait
+        self.interval = interval
+        self.workers = workers
+        self.reserved = reserved
+        self.ceiling: Optional[int] = None
+        self.adjustments = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pool(self) -> InstrumentedPool:
+        return self.engine.sync_engine.pool
+
+    async def _load_budget(self) -> None:
+        async with self.engine.connect() as conn:
+            max_connections = int((await conn.execute(text("SHOW max_connections"))).scalar_one())
+        share = (max_connections - self.reserved) // max(self.workers, 1)
+        self.ceiling = max(share - self.pool.size(), 0)
+        logger.info(
+            "Pool budget: max_connections=%d, %d per worker, overflow ceiling %d",
+            max_connections, share, self.ceiling,
+        )
+
+    def adjust(self) -> None:
+        """Apply one control step from the waits since the previous one."""
+        pool = self.pool
+        window = pool.take_window()
+        current = pool.max_overflow
+        ceiling = current if self.ceiling is None else self.ceiling
+        waits = window["waits"]
+        p95 = _percentile(waits, 95) if waits else 0.0
+
+        if window["timeouts"] or p95 > self.target_wait:
+            new = current + max(current // 4, 1)
+        elif p95 < self.target_wait / 4 and window["peak_checked_out"] < pool.size() + current:
+            new = max(current - 1, 0)
+        else:
+            new = current
+        new = min(new, ceiling)
+
+        if new != current:
+            pool.set_max_overflow(new)
+            self.adjustments += 1
+            logger.info(
+                "Pool %s max_overflow %d -> %d (p95 wait %.1fms, %d timeouts)",
+                pool.label, current, new, p95 * 1000, window["timeouts"],
+            )
+
+    async def _run(self) -> None:
+        try:
+            await self._load_budget()
+        except Exception:
+            logger.exception("Could not read max_connections; overflow will not grow")
+        while True:
+            await asyncio.sleep(self.interval)
+            self.adjust()
+
+    def start(self) -> None:
+        if not isinstance(self.pool, InstrumentedPool):
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="pool-controller")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "max_overflow": self.pool.max_overflow,
+            "ceiling": self.ceiling,
+            "adjustments": self.adjustments,
+        }
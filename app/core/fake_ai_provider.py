@@ -0,0 +1,87 @@
+"""
+Local stand-in for the AI model, for load and soak testing without a network.
+"""
+
+import asyncio
+import math
+import random
+from typing import AsyncIterator, Optional
+
+from app.core.ai_client import AIClientError, AIProvider
+from app.core.config import settings
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class FakeProvider(AIProvider):
+    """
+    Provider that answers locally after a simulated delay.
+
+    Latency is drawn per call from ``distribution`` around ``latency_ms``
+    (``jitter`` is the spread as a fraction of the mean), ``error_rate`` of
+    calls fail with ``AIClientError``, and streamed answers arrive in
+    ``stream_chunks`` fragments spread over the drawn latency. The answer
+    echoes the prompt size so callers can tell responses apart.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = settings.FAKE_AI_LATENCY_MS,
+        distribution: str = settings.FAKE_AI_LATENCY_DISTRIBUTION,
+        jitter: float = settings.FAKE_AI_LATENCY_JITTER,
+        error_rate: float = settings.FAKE_AI_ERROR_RATE,
+        stream_chunks: int = settings.FAKE_AI_STREAM_CHUNKS,
+        seed: Optional[int] = settings.FAKE_AI_SEED,
+        **kwargs,
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution!r}")
+        super().__init__(**kwargs)
+        self.latency = latency_ms / 1000
+        self.distribution = distribution
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stream_chunks = max(stream_chunks, 1)
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        """Draw one call's latency in seconds."""
+        mean, spread = self.latency, self.jitter
+        if self.distribution == "uniform":
+            return self._random.uniform(mean * (1 - spread), mean * (1 + spread))
+        if self.distribution == "exponential":
+            return self._random.expovariate(1 / mean) if mean > 0 else 0.0
+        if self.distribution == "lognormal" and mean > 0:
+            # Parameters chosen so the distribution's mean is ``mean`` and its
+            # coefficient of variation is ``jitter``
+            sigma = math.sqrt(math.log(1 + spread ** 2))
+            return self._random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+
+    def _answer(self, prompt: str) -> str:
+        self.calls += 1
+        if self._random.random() < self.error_rate:
+            raise AIClientError("Simulated model failure")
+        return (
+            f"This is a simulated answer from the local test model "
+            f"(call {self.calls}, prompt of {len(prompt)} characters)."
+        )
+
+    async def _generate(self, prompt: str) -> str:
+        delay = max(self._delay(), 0.0)
+        answer = self._answer(prompt)
+        await asyncio.sleep(delay)
+        return answer
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        delay = max(self._delay(), 0.0)
+        answer = self._answer(prompt)
+        words = answer.split(" ")
+        size = math.ceil(len(words) / self.stream_chunks)
+        for start in range(0, len(words), size):
+            await asyncio.sleep(delay / self.stream_chunks)
+            fragment = " ".join(words[start:start + size])
+            yield fragment if start == 0 else " " + fragment
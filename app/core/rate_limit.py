@@ -0,0 +1,271 @@
+"""
+Admission control for expensive endpoints: per-client rate limits and a
+global in-flight cap, rejecting excess requests with a fast 429.
+"""
+
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Collection, Dict, FrozenSet, List, Optional, Tuple
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# Scope state key holding the caller's limiter key, for charge()
+RATE_LIMIT_KEY = "rate_limit_key"
+
+RATE_LIMITED_DETAIL = "Too many requests, please slow down."
+
+rejected_requests = metrics.counter(
+    "rya_rejected_requests_total",
+    "Rya requests rejected with 429 before doing any work",
+    labelnames=("reason",),
+)
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets.
+
+    Each client may burst ``burst`` requests and then gets ``rate_per_minute``
+    more per minute. Buckets are kept in LRU order and at most ``max_clients``
+    of them are stored; a bucket idle long enough to be full again is
+    indistinguishable from a new one, so it is discarded first.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int):
+        self.rate = rate_per_minute / 60
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        # client key -> (tokens, last update)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str, now: Optional[float] = None, cost: float = 1) -> float:
+        """
+        Take ``cost`` tokens for ``key``.
+
+        A cost above ``burst`` is charged as a full bucket, so it can still
+        be admitted once.
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until it would be
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+
+        state = self._buckets.pop(key, None)
+        if state is None:
+            tokens = float(self.burst)
+            self._prune(now)
+        else:
+            tokens = min(self.burst, state[0] + (now - state[1]) * self.rate)
+
+        cost = min(cost, self.burst)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now)
+            return 0.0
+        self._buckets[key] = (tokens, now)
+        return (cost - tokens) / self.rate
+
+    def _prune(self, now: float) -> None:
+        """Drop refilled buckets, then the least recently used, to make room."""
+        refill_time = self.burst / self.rate
+        while self._buckets:
+            key, (_, updated) = next(iter(self._buckets.items()))
+            if now - updated < refill_time and len(self._buckets) < self.max_clients:
+                break
+            del self._buckets[key]
+            if now - updated < refill_time:
+                self.evicted += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "clients": len(self._buckets),
+            "max_clients": self.max_clients,
+            "per_minute": self.rate * 60,
+            "burst": self.burst,
+            "evicted": self.evicted,
+        }
+
+
+class ConcurrencyGate:
+    """Non-blocking cap on requests in flight; callers over the cap are refused."""
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": self.in_flight, "max_in_flight": self.max_in_flight}
+
+
+def hash_api_key(api_key: bytes) -> str:
+    """Digest an API key, so neither the allow-list nor the limiter holds keys."""
+    return hashlib.blake2b(api_key, digest_size=16).hexdigest()
+
+
+def client_key(
+    scope: Scope,
+    forwarded_hops: int = 0,
+    api_keys: Collection[str] = frozenset(),
+) -> str:
+    """
+    Identify the caller: its ``X-API-Key`` if the key is allowed, else its
+    IP address.
+
+    ``api_keys`` holds the ``hash_api_key`` digests of the allowed keys.
+    Unknown keys are ignored, so sending a fresh key per request neither
+    escapes the limit nor floods the limiter with new buckets.
+
+    Behind ``forwarded_hops`` trusted reverse proxies, the client address is
+    the ``X-Forwarded-For`` entry the outermost proxy appended, counting
+    from the right. Entries to its left come from the client and are
+    ignored, since a caller could send a new one with every request.
+    """
+    headers: Dict[bytes, bytes] = dict(scope.get("headers") or [])
+    api_key = headers.get(b"x-api-key")
+    if api_key and api_keys:
+        digest = hash_api_key(api_key)
+        if digest in api_keys:
+            return "key:" + digest
+    if forwarded_hops > 0:
+        forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1").split(",")
+        if len(forwarded) >= forwarded_hops and forwarded[-forwarded_hops].strip():
+            return "ip:" + forwarded[-forwarded_hops].strip()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+def client_digest(scope: Scope) -> Optional[str]:
+    """
+    Keyed hash of the caller's limiter key, to tell clients apart in logs
+    without storing their IP address or API key.
+    """
+    key = scope.get("state", {}).get(RATE_LIMIT_KEY)
+    if key is None:
+        return None
+    secret = settings.SECRET_KEY.encode("utf-8")[:64]
+    return hashlib.blake2b(key.encode("utf-8"), key=secret, digest_size=16).hexdigest()
+
+
+def _retry_after_header(retry_after: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(math.ceil(retry_after), 1))}
+
+
+def charge(scope: Scope, limiter: TokenBucketLimiter, cost: float) -> None:
+    """
+    Take ``cost`` more tokens from the caller's bucket, for requests the
+    middleware admitted at the price of one but that do more work (a batch
+    of questions).
+
+    Raises:
+        HTTPException: 429 with Retry-After if the bucket is short
+    """
+    key = scope.get("state", {}).get(RATE_LIMIT_KEY)
+    if key is None or cost <= 0:
+        return
+    retry_after = limiter.acquire(key, cost=cost)
+    if retry_after:
+        rejected_requests.inc(reason="rate_limit")
+        raise HTTPException(429, RATE_LIMITED_DETAIL, headers=_retry_after_header(retry_after))
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying a rate limiter and a concurrency gate to the
+    requests under ``path_prefixes``.
+
+    Callers presenting one of ``api_keys`` get a bucket of their own; all
+    other requests are limited by IP address. Every request costs one
+    token; handlers can ``charge`` more once they know the request's size.
+
+    The gate slot is held until the response has been sent completely, so
+    streamed answers count as in flight while they stream.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: TokenBucketLimiter,
+        gate: ConcurrencyGate,
+        path_prefixes: List[str],
+        forwarded_hops: int = 0,
+        busy_retry_after: int = 1,
+        api_keys: Collection[str] = (),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.gate = gate
+        self.path_prefixes = tuple(path_prefixes)
+        self.forwarded_hops = forwarded_hops
+        self.busy_retry_after = busy_retry_after
+        self.api_keys: FrozenSet[str] = frozenset(
+            hash_api_key(key.encode("utf-8")) for key in api_keys if key
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(scope, self.forwarded_hops, self.api_keys)
+        scope.setdefault("state", {})[RATE_LIMIT_KEY] = key
+        retry_after = self.limiter.acquire(key)
+        if retry_after:
+            rejected_requests.inc(reason="rate_limit")
+            await self._reject(RATE_LIMITED_DETAIL, retry_after)(scope, receive, send)
+            return
+
+        if not self.gate.try_acquire():
+            rejected_requests.inc(reason="capacity")
+            await self._reject(
+                "Rya is busy answering other questions, please try again shortly.",
+                self.busy_retry_after,
+            )(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release()
+
+    @staticmethod
+    def _reject(detail: str, retry_after: float) -> JSONResponse:
+        return JSONResponse(
+            {"detail": detail},
+            status_code=429,
+            headers=_retry_after_header(retry_after),
+        )
+
+
+# Singleton instances
+rya_rate_limiter = TokenBucketLimiter(
+    rate_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    burst=settings.RATE_LIMIT_BURST,
+    max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+)
+rya_admission_gate = ConcurrencyGate(settings.RATE_LIMIT_MAX_IN_FLIGHT)
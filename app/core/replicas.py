@@ -0,0 +1,130 @@
+"""
+Read replica pool with round-robin selection and background health checks.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+replica_healthy = metrics.gauge(
+    "db_replica_healthy",
+    "Whether a read replica passed its last health check (1) or not (0)",
+    labelnames=("replica",),
+)
+
+
+class ReplicaPool:
+    """
+    Round-robin over the healthy read replicas.
+
+    A background task connects and runs ``SELECT 1`` on every replica each
+    ``check_interval`` seconds; replicas that fail or take longer than
+    ``check_timeout`` (connecting included) are skipped until they pass again. Replicas start out
+    healthy so reads do not wait for the first check.
+
+    Every database write (``mark_write``) opens a read-your-writes window of
+    ``read_your_writes`` seconds during which reads go to the primary, so an
+    edit is never followed by a read from a replica that has not replayed it
+    yet. The window is per process.
+    """
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        check_interval: float,
+        check_timeout: float,
+        read_your_writes: float,
+    ):
+        self.engines = engines
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.read_your_writes = read_your_writes
+        self._healthy = [True] * len(engines)
+        self._cycle = itertools.cycle(range(len(engines)))
+        self._last_write = float("-inf")
+        self._task: Optional[asyncio.Task] = None
+        self.reads = [0] * len(engines)
+        self.primary_reads = 0
+        for index in range(len(engines)):
+            replica_healthy.set(1, replica=str(index))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def mark_write(self) -> None:
+        """Record a committed write; reads stay on the primary for a while."""
+        self._last_write = time.monotonic()
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """
+        Return the next healthy replica, or None when reads should go to the
+        primary (no healthy replica, or a recent write).
+        """
+        if self.enabled and time.monotonic() - self._last_write >= self.read_your_writes:
+            for _ in range(len(self.engines)):
+                index = next(self._cycle)
+                if self._healthy[index]:
+                    self.reads[index] += 1
+                    return self.engines[index]
+        self.primary_reads += 1
+        return None
+
+    @staticmethod
+    async def _ping(engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _check(self, index: int) -> None:
+        # The timeout covers connecting too: an unreachable replica must not
+        # hold up the other checks, which run together
+        try:
+            await asyncio.wait_for(self._ping(self.engines[index]), self.check_timeout)
+            healthy = True
+        except Exception as e:
+            healthy = False
+            if self._healthy[index]:
+                reason = "timed out" if isinstance(e, asyncio.TimeoutError) else e
+                logger.warning("Read replica %d failed its health check: %s", index, reason)
+        if healthy and not self._healthy[index]:
+            logger.warning("Read replica %d is healthy again", index)
+        self._healthy[index] = healthy
+        replica_healthy.set(int(healthy), replica=str(index))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(*(self._check(i) for i in range(len(self.engines))))
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        """Start the health checks on the running event loop."""
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="replica-health-check")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for engine in self.engines:
+            await engine.dispose()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "replicas": len(self.engines),
+            "healthy": sum(self._healthy),
+            "replica_reads": self.reads,
+            "primary_reads": self.primary_reads,
+        }
@@ -0,0 +1,80 @@
+"""
+Per-stage latency timers, exported as histograms and as a Server-Timing header.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import metrics
+
+stage_seconds = metrics.histogram(
+    "rya_stage_seconds",
+    "Time spent in each stage of answering a Rya question",
+    labelnames=("stage",),
+)
+
+# Stage durations (seconds) of the current request, when it is being timed
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as stage ``name``.
+
+    The duration is always observed in ``rya_stage_seconds``; inside a timed
+    request it is also added to that request's Server-Timing entries.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stage_seconds.observe(elapsed, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """Format stage durations as a ``Server-Timing`` header value."""
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that collects the stages timed while handling a request
+    and reports them, plus the time to the response start as ``total``, in a
+    ``Server-Timing`` header.
+
+    Streaming responses only report the stages finished before the first
+    byte is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and timings:
+                timings["total"] = time.perf_counter() - started
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(timings))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
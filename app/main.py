@@ -4,13 +4,24 @@ Production-ready FastAPI backend for personal portfolio application.
 """
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, pool_controller, replica_pool
+from app.core.db_pool import pool_stats
+from app.core.ai_client import get_ai_provider
+from app.core.metrics import metrics
+from app.core.rate_limit import AdmissionMiddleware, rya_admission_gate, rya_rate_limiter
+from app.core.timing import ServerTimingMiddleware
+from app.services.answer_cache import answer_cache
+from app.services.conversation_store import conversation_store
+from app.services.interaction_log_writer import interaction_log_writer
+from app.services.faq_service import faq_index
+from app.services.rya_ai_service import inflight_answers, refresh_faq
 from app.versions.v1.routers import (
     personal,
     skills,
@@ -35,8 +46,18 @@ async def lifespan(app: FastAPI):
         print(f"Database initialization error: {e}")
         # Don't fail startup if tables already exist
         pass
+    replica_pool.start()
+    if settings.DATABASE_POOL_ADAPTIVE:
+        pool_controller.start()
+    interaction_log_writer.start()
+    if settings.RYA_FAQ_ENABLED:
+        faq_index.start(refresh_faq)
     yield
     # Shutdown
+    await faq_index.stop()
+    await interaction_log_writer.stop()
+    await pool_controller.stop()
+    await replica_pool.stop()
     await engine.dispose()
 
 
@@ -50,6 +71,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Rya admission control (added first so CORS headers wrap its 429 responses)
+app.add_middleware(
+    AdmissionMiddleware,
+    limiter=rya_rate_limiter,
+    gate=rya_admission_gate,
+    path_prefixes=[f"{settings.API_V1_PREFIX}/rya/ask"],
+    forwarded_hops=settings.RATE_LIMIT_FORWARDED_HOPS,
+    api_keys=settings.RATE_LIMIT_API_KEYS,
+)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -59,6 +90,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-stage timings in a Server-Timing header (outermost, to time everything)
+if settings.RYA_SERVER_TIMING:
+    app.add_middleware(ServerTimingMiddleware)
+
 # Include V1 Routers
 app.include_router(
     personal.router,
@@ -116,5 +151,25 @@ async def health_check():
     return {
         "status": "healthy",
         "database": "connected",
+        "db_pool": pool_stats(engine),
+        "db_pool_controller": pool_controller.stats(),
+        "read_replicas": replica_pool.stats(),
         "ai_service": "ready",
+        "ai_provider": get_ai_provider().name,
+        "ai_queue": get_ai_provider().stats(),
+        "answer_cache": answer_cache.stats(),
+        "coalesced_questions": inflight_answers.stats(),
+        "sessions": conversation_store.stats(),
+        "faq": faq_index.stats(),
+        "rate_limit": rya_rate_limiter.stats(),
+        "admission": rya_admission_gate.stats(),
+        "log_writer": interaction_log_writer.stats(),
     }
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -8,7 +8,11 @@ from app.models.models import (
     Project,
     Experience,
     ContactRequest,
+    AIContextSnapshot,
     AIContextLog,
+    AIDailyStats,
+    AIDailyQuestion,
+    AIFAQAnswer,
 )
 
 __all__ = [
@@ -19,5 +23,9 @@ __all__ = [
     "Project",
     "Experience",
     "ContactRequest",
+    "AIContextSnapshot",
     "AIContextLog",
+    "AIDailyStats",
+    "AIDailyQuestion",
+    "AIFAQAnswer",
 ]
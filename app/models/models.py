@@ -3,11 +3,11 @@ Database models for the portfolio application.
 """
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List
-from sqlalchemy import String, Text, Boolean, DateTime, ForeignKey, ARRAY, JSON
+from sqlalchemy import String, Text, Boolean, Date, DateTime, ForeignKey, ARRAY, JSON, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from app.core.database import Base
 
@@ -139,6 +139,18 @@ class ContactRequest(Base):
     )
 
 
+class AIContextSnapshot(Base):
+    """Content-addressed AI context shared by many interaction logs."""
+
+    __tablename__ = "context_snapshots"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of jsonb text
+    context: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+
 class AIContextLog(Base):
     """AI interaction logs model."""
 
@@ -149,7 +161,63 @@ class AIContextLog(Base):
     )
     user_question: Mapped[str] = mapped_column(Text, nullable=False)
     ai_response: Mapped[str] = mapped_column(Text, nullable=False)
+    # Legacy inline copy; new rows reference context_snapshots instead
     used_context: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    context_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), ForeignKey("context_snapshots.hash"), nullable=True
+    )
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(
+        nullable=True
+    )  # estimated; NULL when answered without a model call
+    client_hash: Mapped[Optional[str]] = mapped_column(
+        String(32), nullable=True
+    )  # keyed hash of the caller (IP or API key); NULL when unknown
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+
+
+class AIDailyStats(Base):
+    """Per-day totals of Rya interactions, maintained as logs are written."""
+
+    __tablename__ = "ai_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # UTC
+    questions: Mapped[int] = mapped_column(default=0, nullable=False)
+    failed: Mapped[int] = mapped_column(default=0, nullable=False)
+    answer_chars: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    ai_calls: Mapped[int] = mapped_column(default=0, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class AIDailyQuestion(Base):
+    """Per-day count of each distinct (normalized) Rya question."""
+
+    __tablename__ = "ai_daily_questions"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # UTC
+    question_hash: Mapped[str] = mapped_column(
+        String(64), primary_key=True
+    )  # sha256 of the normalized question
+    question: Mapped[str] = mapped_column(
+        Text, nullable=False
+    )  # first wording seen that day
+    count: Mapped[int] = mapped_column(default=0, nullable=False)
+
+
+class AIFAQAnswer(Base):
+    """Precomputed FAQ answer, shared by every worker, per portfolio content."""
+
+    __tablename__ = "ai_faq_answers"
+
+    content_key: Mapped[str] = mapped_column(
+        String(32), primary_key=True
+    )  # PortfolioSnapshot.content_key of the data it was answered from
+    intent: Mapped[str] = mapped_column(
+        Text, primary_key=True
+    )  # the intent's terms, sorted and space-separated
+    question: Mapped[str] = mapped_column(Text, nullable=False)
+    answer: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
     )
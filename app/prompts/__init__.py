@@ -1,5 +1,15 @@
 """Prompts module initialization."""
 
-from app.prompts.rya_system_prompt import RYA_SYSTEM_PROMPT
+from app.prompts.rya_system_prompt import (
+    RYA_SYSTEM_PROMPT,
+    RYA_PROMPT_TEMPLATE,
+    RYA_FOLLOW_UP_TEMPLATE,
+    RYA_BATCH_TEMPLATE,
+)
 
-__all__ = ["RYA_SYSTEM_PROMPT"]
+__all__ = [
+    "RYA_SYSTEM_PROMPT",
+    "RYA_PROMPT_TEMPLATE",
+    "RYA_FOLLOW_UP_TEMPLATE",
+    "RYA_BATCH_TEMPLATE",
+]
@@ -32,3 +32,41 @@ EXAMPLE RESPONSES:
 
 Remember: You are a helpful assistant, not the portfolio owner themselves. Refer to them in third person.
 """
+
+
+# Full prompt sent to the model; filled with str.format()
+RYA_PROMPT_TEMPLATE = """
+{system_prompt}
+
+PORTFOLIO DATA CONTEXT:
+{context}
+
+USER QUESTION:
+{user_question}
+
+INSTRUCTIONS:
+- Answer ONLY using the portfolio data provided above
+- If the information is not available in the context, politely say so
+- Be helpful, professional, and concise
+- Speak as if you know the portfolio owner personally
+- Never make up information that isn't in the context
+
+RESPONSE:
+"""
+
+
+# Replaces USER QUESTION in RYA_PROMPT_TEMPLATE for follow-ups in a session
+RYA_FOLLOW_UP_TEMPLATE = """CONVERSATION SO FAR:
+{history}
+
+FOLLOW-UP QUESTION (use the conversation only to understand what it refers to):
+{question}"""
+
+
+# Replaces USER QUESTION in RYA_PROMPT_TEMPLATE to answer several questions at once
+RYA_BATCH_TEMPLATE = """The visitor asked {count} questions:
+{questions}
+
+Answer each question separately. Reply with ONLY a JSON object of the form
+{{"answers": ["answer to question 1", "answer to question 2", ...]}}
+containing exactly {count} answers in the same order, and nothing else."""
@@ -40,6 +40,12 @@ from app.schemas.contact import (
 from app.schemas.rya_ai import (
     RyaQuestionRequest,
     RyaAnswerResponse,
+    RyaBatchQuestionRequest,
+    RyaBatchAnswerItem,
+    RyaBatchAnswerResponse,
+    RyaDailyStats,
+    RyaTopQuestion,
+    RyaAnalyticsResponse,
     AIContextLogResponse,
 )
 from app.schemas.tags import TagBase, TagCreate, TagResponse
@@ -79,6 +85,12 @@ __all__ = [
     # Rya AI
     "RyaQuestionRequest",
     "RyaAnswerResponse",
+    "RyaBatchQuestionRequest",
+    "RyaBatchAnswerItem",
+    "RyaBatchAnswerResponse",
+    "RyaDailyStats",
+    "RyaTopQuestion",
+    "RyaAnalyticsResponse",
     "AIContextLogResponse",
     # Tags
     "TagBase",
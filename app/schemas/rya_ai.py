@@ -2,11 +2,17 @@
 Pydantic schemas for Rya AI Assistant.
 """
 
-from datetime import datetime
-from typing import Optional, Dict, Any
+from datetime import date, datetime
+from typing import Annotated, Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
+# Longest question accepted, in characters: RYA_MAX_QUESTION_TOKENS at the
+# prompt budgeter's estimate of 4 characters per token
+MAX_QUESTION_CHARS = settings.RYA_MAX_QUESTION_TOKENS * 4
+
 
 class RyaQuestionRequest(BaseModel):
     """Schema for asking Rya a question."""
@@ -14,9 +20,20 @@ class RyaQuestionRequest(BaseModel):
     question: str = Field(
         ...,
         min_length=1,
+        max_length=MAX_QUESTION_CHARS,
         example="What technologies does Ramya use?",
         description="The question to ask Rya about the portfolio owner.",
     )
+    session_id: Optional[str] = Field(
+        None,
+        max_length=64,
+        example="Zx8Q0m3pWcH2x1tq9dYb6g",
+        description="Conversation to continue.",
+    )
+    start_session: bool = Field(
+        False,
+        description="Start a new conversation with this question so follow-ups can refer to it.",
+    )
 
 
 class RyaAnswerResponse(BaseModel):
@@ -26,6 +43,66 @@ class RyaAnswerResponse(BaseModel):
         ...,
         example="Ramya specializes in NestJS, PostgreSQL, Flutter, and has experience with cloud technologies like AWS.",
     )
+    session_id: Optional[str] = Field(
+        None,
+        example="Zx8Q0m3pWcH2x1tq9dYb6g",
+        description=(
+            "Conversation this answer belongs to; send it with follow-up questions. "
+            "Null for one-off questions."
+        ),
+    )
+
+
+class RyaBatchQuestionRequest(BaseModel):
+    """Schema for asking Rya several questions at once."""
+
+    questions: List[Annotated[str, Field(min_length=1, max_length=MAX_QUESTION_CHARS)]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.RYA_BATCH_MAX_QUESTIONS,
+        example=["What technologies does Ramya use?", "What projects has Ramya built?"],
+        description="Questions to ask Rya, answered in the same order.",
+    )
+
+
+class RyaBatchAnswerItem(BaseModel):
+    """Answer, or error, for one question of a batch."""
+
+    question: str
+    answer: Optional[str] = None
+    error: Optional[str] = None
+
+
+class RyaBatchAnswerResponse(BaseModel):
+    """Schema for Rya's answers to a batch of questions."""
+
+    answers: List[RyaBatchAnswerItem]
+
+
+class RyaDailyStats(BaseModel):
+    """Rya usage for one UTC day."""
+
+    day: date
+    questions: int = Field(..., description="Questions answered or attempted.")
+    failed: int = Field(..., description="Questions answered with an error or aborted stream.")
+    error_rate: float
+    avg_answer_chars: float
+    ai_calls: int = Field(..., description="Questions that needed an AI model call.")
+    avg_prompt_tokens: float = Field(..., description="Estimated prompt tokens per AI call.")
+
+
+class RyaTopQuestion(BaseModel):
+    """A frequently asked question; wordings that normalize alike are counted together."""
+
+    question: str
+    count: int
+
+
+class RyaAnalyticsResponse(BaseModel):
+    """Schema for Rya usage analytics."""
+
+    days: List[RyaDailyStats]
+    top_questions: List[RyaTopQuestion]
 
 
 class AIContextLogResponse(BaseModel):
@@ -35,6 +112,8 @@ class AIContextLogResponse(BaseModel):
     user_question: str
     ai_response: str
     used_context: Optional[Dict[str, Any]]
+    context_hash: Optional[str] = None
+    prompt_tokens: Optional[int] = None
     created_at: datetime
 
     class Config:
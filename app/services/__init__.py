@@ -7,6 +7,7 @@ from app.services.projects_service import ProjectService
 from app.services.experience_service import ExperienceService
 from app.services.contact_service import ContactService
 from app.services.rya_ai_service import RyaAIService
+from app.services.analytics_service import AnalyticsService
 
 __all__ = [
     "PersonalInfoService",
@@ -16,4 +17,5 @@ __all__ = [
     "ExperienceService",
     "ContactService",
     "RyaAIService",
+    "AnalyticsService",
 ]
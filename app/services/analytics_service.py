@@ -0,0 +1,155 @@
+"""
+Analytics Service - Daily rollups of Rya interactions.
+"""
+
+import hashlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Mapping, Tuple
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Insert
+
+from app.models import AIDailyQuestion, AIDailyStats
+from app.utils.text import normalize_question
+
+# Start of the answer logged when the model could not answer
+APOLOGY_PREFIX = "I apologize, but I'm having trouble processing your request right now."
+# End of a streamed answer the visitor did not receive in full
+ABORTED_MARKER = "[stream aborted]"
+
+STAT_COLUMNS = ("questions", "failed", "answer_chars", "ai_calls", "prompt_tokens")
+
+
+def is_failed_answer(response: str) -> bool:
+    """Whether a logged response is an error rather than an answer."""
+    return response.startswith(APOLOGY_PREFIX) or response.endswith(ABORTED_MARKER)
+
+
+def question_hash(question: str) -> str:
+    """Key under which wordings of the same question are counted together."""
+    return hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()
+
+
+class DailyRollup:
+    """
+    Increments of the daily rollup tables for a set of log rows.
+
+    Rows are mappings with the ``ai_context_logs`` columns ``user_question``,
+    ``ai_response``, ``prompt_tokens`` and ``created_at`` (UTC).
+    """
+
+    def __init__(self):
+        self.stats: Dict[date, Dict[str, Any]] = {}
+        self.questions: Dict[Tuple[date, str], Dict[str, Any]] = {}
+
+    def add(self, row: Mapping[str, Any]) -> None:
+        day = row["created_at"].date()
+        stats = self.stats.setdefault(
+            day, {"day": day, **{column: 0 for column in STAT_COLUMNS}}
+        )
+        stats["questions"] += 1
+        stats["failed"] += is_failed_answer(row["ai_response"])
+        stats["answer_chars"] += len(row["ai_response"])
+        if row["prompt_tokens"] is not None:
+            stats["ai_calls"] += 1
+            stats["prompt_tokens"] += row["prompt_tokens"]
+
+        key = (day, question_hash(row["user_question"]))
+        entry = self.questions.setdefault(
+            key,
+            {"day": day, "question_hash": key[1], "question": row["user_question"].strip(), "count": 0},
+        )
+        entry["count"] += 1
+
+    def statements(self) -> List[Tuple[Insert, List[Dict[str, Any]]]]:
+        """
+        Return ``(statement, params)`` upserts that add the increments.
+
+        Parameters are sorted by key so concurrent writers lock rows in the
+        same order.
+        """
+        statements = []
+        if self.stats:
+            stmt = pg_insert(AIDailyStats)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day"],
+                set_={c: getattr(AIDailyStats, c) + getattr(stmt.excluded, c) for c in STAT_COLUMNS},
+            )
+            statements.append((stmt, [self.stats[k] for k in sorted(self.stats)]))
+        if self.questions:
+            stmt = pg_insert(AIDailyQuestion)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["day", "question_hash"],
+                set_={"count": AIDailyQuestion.count + stmt.excluded["count"]},
+            )
+            statements.append((stmt, [self.questions[k] for k in sorted(self.questions)]))
+        return statements
+
+
+async def update_rollups(session: AsyncSession, rows: List[Mapping[str, Any]]) -> None:
+    """Add log rows to the daily rollups, in the caller's transaction."""
+    rollup = DailyRollup()
+    for row in rows:
+        rollup.add(row)
+    for stmt, params in rollup.statements():
+        await session.execute(stmt, params)
+
+
+class AnalyticsService:
+    """Service class for Rya usage analytics, read from the daily rollups."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_summary(self, days: int, top: int) -> Dict[str, Any]:
+        """
+        Summarize the last ``days`` UTC days, today included.
+
+        Reads only the rollup tables, so the cost depends on the number of
+        days and distinct questions, not on the size of the log table.
+        """
+        today = datetime.utcnow().date()
+        since = today - timedelta(days=days - 1)
+
+        result = await self.db.execute(
+            select(AIDailyStats).where(AIDailyStats.day >= since)
+        )
+        by_day = {s.day: s for s in result.scalars().all()}
+
+        daily = []
+        for offset in range(days):
+            day = since + timedelta(days=offset)
+            stats = by_day.get(day)
+            questions = stats.questions if stats else 0
+            failed = stats.failed if stats else 0
+            ai_calls = stats.ai_calls if stats else 0
+            daily.append(
+                {
+                    "day": day,
+                    "questions": questions,
+                    "failed": failed,
+                    "error_rate": failed / questions if questions else 0.0,
+                    "avg_answer_chars": stats.answer_chars / questions if questions else 0.0,
+                    "ai_calls": ai_calls,
+                    "avg_prompt_tokens": stats.prompt_tokens / ai_calls if ai_calls else 0.0,
+                }
+            )
+
+        # Each day keeps its first wording; show the earliest day's
+        count = func.sum(AIDailyQuestion.count).label("count")
+        first_wording = func.array_agg(
+            aggregate_order_by(AIDailyQuestion.question, AIDailyQuestion.day)
+        )[1]
+        result = await self.db.execute(
+            select(first_wording.label("question"), count)
+            .where(AIDailyQuestion.day >= since)
+            .group_by(AIDailyQuestion.question_hash)
+            .order_by(desc(count))
+            .limit(top)
+        )
+        top_questions = [{"question": q, "count": c} for q, c in result.all()]
+
+        return {"days": daily, "top_questions": top_questions}
@@ -0,0 +1,106 @@
+"""
+Answer Cache - Reuses Rya answers for repeated questions.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.portfolio_snapshot import portfolio_snapshot_store
+
+
+class AnswerCache:
+    """
+    LRU cache of answers keyed by normalized question and portfolio content.
+
+    Keys use the snapshot's ``content_key``, so a worker that did not handle
+    an edit stops serving pre-edit answers as soon as its snapshot expires
+    and is reloaded with the new data.
+
+    The last good answer to each question is also kept, regardless of data
+    or TTL, as a fallback for when the model is unavailable.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._last_good: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, normalized_question: str, content_key: str) -> Optional[str]:
+        """Return a cached answer, or None on a miss or expired entry."""
+        if not self.enabled:
+            return None
+
+        key = (normalized_question, content_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        answer, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, normalized_question: str, content_key: str, answer: str) -> None:
+        """Store an answer, evicting the least recently used entry if full."""
+        if not self.enabled:
+            return
+
+        key = (normalized_question, content_key)
+        self._entries[key] = (answer, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        self._last_good[normalized_question] = answer
+        self._last_good.move_to_end(normalized_question)
+        while len(self._last_good) > self.max_entries:
+            self._last_good.popitem(last=False)
+
+    def last_good(self, normalized_question: str) -> Optional[str]:
+        """Return the most recent answer to the question, possibly stale."""
+        answer = self._last_good.get(normalized_question)
+        if answer is not None:
+            self._last_good.move_to_end(normalized_question)
+            self.stale_hits += 1
+        return answer
+
+    def clear(self, *_args) -> None:
+        """Drop every entry (used as a data-version listener)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return size and hit/miss counters."""
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+        }
+
+
+# Singleton instance
+answer_cache = AnswerCache(
+    max_entries=settings.RYA_ANSWER_CACHE_SIZE,
+    ttl_seconds=settings.RYA_ANSWER_CACHE_TTL_SECONDS,
+)
+portfolio_snapshot_store.add_listener(answer_cache.clear)
@@ -4,10 +4,11 @@ Certifications Service - Business logic layer.
 
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Certification
+from app.services.portfolio_snapshot import portfolio_snapshot_store
+from app.services.queries import ALL_CERTIFICATIONS, CERTIFICATION_BY_ID
 from app.schemas import CertificationCreate, CertificationUpdate
 
 
@@ -19,14 +20,12 @@ class CertificationService:
 
     async def get_all_certifications(self) -> List[Certification]:
         """Get all certifications."""
-        result = await self.db.execute(select(Certification))
+        result = await self.db.execute(ALL_CERTIFICATIONS)
         return list(result.scalars().all())
 
     async def get_certification_by_id(self, cert_id: UUID) -> Optional[Certification]:
         """Get a certification by ID."""
-        result = await self.db.execute(
-            select(Certification).where(Certification.id == cert_id)
-        )
+        result = await self.db.execute(CERTIFICATION_BY_ID, {"id": cert_id})
         return result.scalar_one_or_none()
 
     async def create_certification(self, data: CertificationCreate) -> Certification:
@@ -35,15 +34,14 @@ class CertificationService:
         self.db.add(certification)
         await self.db.flush()
         await self.db.refresh(certification)
+        portfolio_snapshot_store.invalidate(self.db)
         return certification
 
     async def update_certification(
         self, cert_id: UUID, data: CertificationUpdate
     ) -> Optional[Certification]:
         """Update a certification."""
-        result = await self.db.execute(
-            select(Certification).where(Certification.id == cert_id)
-        )
+        result = await self.db.execute(CERTIFICATION_BY_ID, {"id": cert_id})
         certification = result.scalar_one_or_none()
 
         if certification:
@@ -52,17 +50,17 @@ class CertificationService:
                 setattr(certification, field, value)
             await self.db.flush()
             await self.db.refresh(certification)
+            portfolio_snapshot_store.invalidate(self.db)
 
         return certification
 
     async def delete_certification(self, cert_id: UUID) -> bool:
         """Delete a certification."""
-        result = await self.db.execute(
-            select(Certification).where(Certification.id == cert_id)
-        )
+        result = await self.db.execute(CERTIFICATION_BY_ID, {"id": cert_id})
         certification = result.scalar_one_or_none()
 
         if certification:
             await self.db.delete(certification)
+            portfolio_snapshot_store.invalidate(self.db)
             return True
         return False
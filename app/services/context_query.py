@@ -0,0 +1,117 @@
+"""
+Context Query - Loads the Rya portfolio context in a single SQL statement.
+"""
+
+from functools import lru_cache
+from typing import Any, Collection, Dict, FrozenSet
+
+from sqlalchemy import JSON, Select, Text, cast, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Certification, Experience, PersonalInfo, Project, Skill
+from app.services.portfolio_snapshot import SECTIONS
+
+
+def _object(type_=None, **columns) -> Any:
+    """
+    ``json_build_object`` of the given keys and column expressions.
+
+    Keys are inlined rather than bound: the function is variadic, so the
+    database could not infer the type of key parameters.
+    """
+    args = []
+    for key, column in columns.items():
+        args.extend((literal_column(f"'{key}'"), column))
+    return func.json_build_object(*args, type_=type_)
+
+
+def _as_text(column) -> Any:
+    """Render a timestamp the way ``str(datetime)`` does in the ORM path."""
+    return cast(column, Text)
+
+
+def _list(model, record) -> Any:
+    """JSON array of ``record`` for every row of ``model`` (``[]`` when empty)."""
+    return func.coalesce(
+        select(func.json_agg(record)).select_from(model).scalar_subquery(),
+        literal_column("'[]'::json"),
+    )
+
+
+def _section_columns() -> Dict[str, Any]:
+    return {
+        "personal_info": (
+            select(
+                _object(
+                    name=PersonalInfo.name,
+                    place=PersonalInfo.place,
+                    country=PersonalInfo.country,
+                    email=PersonalInfo.email,
+                    bio=PersonalInfo.bio,
+                )
+            )
+            .limit(1)
+            .scalar_subquery()
+        ),
+        "skills": _list(
+            Skill,
+            _object(
+                name=Skill.name,
+                category=Skill.category,
+                proficiency_level=Skill.proficiency_level,
+                is_hobby=Skill.is_hobby,
+            ),
+        ),
+        "certifications": _list(
+            Certification,
+            _object(
+                title=Certification.title,
+                issuer=Certification.issuer,
+                issue_date=_as_text(Certification.issue_date),
+            ),
+        ),
+        "projects": _list(
+            Project,
+            _object(
+                title=Project.title,
+                description=Project.description,
+                tech_stack=Project.tech_stack,
+                project_type=Project.project_type,
+                github_url=Project.github_url,
+                live_url=Project.live_url,
+            ),
+        ),
+        "experience": _list(
+            Experience,
+            _object(
+                company_name=Experience.company_name,
+                role=Experience.role,
+                description=Experience.description,
+                start_date=_as_text(Experience.start_date),
+                end_date=_as_text(Experience.end_date),
+                learnings=Experience.learnings,
+            ),
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def context_statement(sections: FrozenSet[str]) -> Select:
+    """
+    Return the statement loading ``sections`` as one JSON object.
+
+    Each section is a scalar subquery, so the whole context comes back in
+    one row of one round trip, already in the context dict shape.
+    Statements are built once per set of sections.
+    """
+    columns = _section_columns()
+    pairs = {name: columns[name] for name in SECTIONS if name in sections}
+    return select(_object(type_=JSON, **pairs))
+
+
+async def fetch_context(session: AsyncSession, sections: Collection[str]) -> Dict[str, Any]:
+    """Load the portfolio context of ``sections`` in a single statement."""
+    context = (await session.execute(context_statement(frozenset(sections)))).scalar_one()
+    if context.get("personal_info") is None:
+        context.pop("personal_info", None)
+    return context
@@ -0,0 +1,132 @@
+"""
+Context Renderer - Turns portfolio snapshots into the Rya prompt context.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from app.services.portfolio_snapshot import SECTIONS, PortfolioSnapshot, Record
+
+EMPTY_CONTEXT = "No portfolio data available."
+
+
+def render_personal_info(info: Record) -> str:
+    """Render the personal information block."""
+    return f"""
+PERSONAL INFORMATION:
+- Name: {info.get('name', 'N/A')}
+- Location: {info.get('place', 'N/A')}, {info.get('country', 'N/A')}
+- Email: {info.get('email', 'N/A')}
+- Bio: {info.get('bio', 'N/A')}
+"""
+
+
+def render_skill(skill: Record) -> str:
+    """Render one skill line."""
+    line = f"- {skill['name']} ({skill['category']}) - Proficiency: {skill.get('proficiency_level', 'N/A')}%"
+    if skill.get('is_hobby'):
+        line += " [Hobby]"
+    return line + "\n"
+
+
+def render_certification(cert: Record) -> str:
+    """Render one certification line."""
+    line = f"- {cert['title']} by {cert['issuer']}"
+    if cert.get('issue_date'):
+        line += f" (Issued: {cert['issue_date']})"
+    return line + "\n"
+
+
+def render_project(project: Record) -> str:
+    """Render one project entry."""
+    parts = [
+        f"- {project['title']} ({project['project_type']})\n",
+        f"  Description: {project.get('description', 'N/A')}\n",
+    ]
+    if project.get('tech_stack'):
+        parts.append(f"  Technologies: {', '.join(project['tech_stack'])}\n")
+    return "".join(parts)
+
+
+def render_experience(exp: Record) -> str:
+    """Render one work experience entry."""
+    parts = [f"- {exp['role']} at {exp['company_name']}\n"]
+    if exp.get('start_date'):
+        end = exp.get('end_date') or 'Present'
+        parts.append(f"  Duration: {exp['start_date']} - {end}\n")
+    if exp.get('description'):
+        parts.append(f"  Description: {exp['description']}\n")
+    if exp.get('learnings'):
+        parts.append(f"  Key Learnings: {exp['learnings']}\n")
+    return "".join(parts)
+
+
+# Header and per-record renderer for each list section
+LIST_SECTIONS: Dict[str, Tuple[str, Callable[[Record], str]]] = {
+    "skills": ("\nSKILLS:\n", render_skill),
+    "certifications": ("\nCERTIFICATIONS:\n", render_certification),
+    "projects": ("\nPROJECTS:\n", render_project),
+    "experience": ("\nWORK EXPERIENCE:\n", render_experience),
+}
+
+
+def render_section(name: str, content) -> str:
+    """Render one section; returns an empty string if it has no data."""
+    if not content:
+        return ""
+    if name == "personal_info":
+        return render_personal_info(content)
+    header, render_record = LIST_SECTIONS[name]
+    return header + "".join(render_record(record) for record in content)
+
+
+def join_sections(fragments: Sequence[str]) -> str:
+    """Assemble rendered sections into the final context string."""
+    parts = [fragment for fragment in fragments if fragment]
+    return "\n".join(parts) if parts else EMPTY_CONTEXT
+
+
+class ContextRenderer:
+    """
+    Renders snapshot sections once per distinct content.
+
+    Rendered fragments are cached by the section's content hash, so an edit to
+    one project only re-renders the PROJECTS block; the assembled context is
+    also kept for the latest snapshot, making unchanged requests free.
+    """
+
+    def __init__(self, max_fragments: int = 64):
+        self.max_fragments = max_fragments
+        self._fragments: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._last: Optional[Tuple[PortfolioSnapshot, str]] = None
+
+    def _fragment(self, snapshot: PortfolioSnapshot, name: str) -> str:
+        key = (name, snapshot.digests[name])
+        fragment = self._fragments.get(key)
+        if fragment is not None:
+            self._fragments.move_to_end(key)
+            return fragment
+
+        fragment = render_section(name, getattr(snapshot, name))
+        self._fragments[key] = fragment
+        if len(self._fragments) > self.max_fragments:
+            self._fragments.popitem(last=False)
+        return fragment
+
+    def fragments(self, snapshot: PortfolioSnapshot) -> Dict[str, str]:
+        """Return the rendered fragment of every section, in prompt order."""
+        return {name: self._fragment(snapshot, name) for name in SECTIONS}
+
+    def render(self, snapshot: PortfolioSnapshot) -> str:
+        """Return the prompt context for ``snapshot``."""
+        last = self._last
+        if last is not None and last[0] is snapshot:
+            return last[1]
+
+        text = join_sections(list(self.fragments(snapshot).values()))
+        self._last = (snapshot, text)
+        return text
+
+
+# Singleton instance
+context_renderer = ContextRenderer()
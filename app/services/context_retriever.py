@@ -0,0 +1,156 @@
+"""
+Context Retriever - Picks the portfolio records relevant to a question.
+"""
+
+import dataclasses
+import math
+from collections import Counter
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Tuple
+
+from app.core.config import settings
+from app.services.context_renderer import LIST_SECTIONS
+from app.services.portfolio_snapshot import PortfolioSnapshot, Record, content_digest
+from app.utils.text import index_terms
+
+# Extra terms indexed with every record of a section, so "what certifications
+# do they have?" matches certification records that never say "certification"
+SECTION_TERMS = {
+    "skills": "skill skills technology technologies tech stack tools",
+    "certifications": "certification certifications certificate certified credential",
+    "projects": "project projects built build portfolio",
+    "experience": "experience work job role company career employment worked",
+}
+
+DocKey = Tuple[str, str]
+
+
+@dataclasses.dataclass
+class _Document:
+    """One indexed record."""
+
+    section: str
+    position: int
+    record: Record
+    digest: str
+    length: int
+    terms: FrozenSet[str]
+
+
+class ContextRetriever:
+    """
+    Lexical BM25 index over the list sections of a portfolio snapshot.
+
+    Records are keyed by content hash, so moving to a new snapshot only
+    indexes records that were added or changed and drops the ones that were
+    removed. Sections a snapshot did not load are left as indexed. Personal
+    info is not indexed; it is always kept as the header.
+    """
+
+    def __init__(self, top_k: int, k1: float = 1.5, b: float = 0.75):
+        self.top_k = top_k
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[DocKey, _Document] = {}
+        self._postings: Dict[str, Dict[DocKey, int]] = {}
+        self._total_length = 0
+        # Section digest the index was last synced to
+        self._synced: Dict[str, str] = {}
+
+    def _add(self, key: DocKey, section: str, position: int, record: Record) -> None:
+        terms = index_terms(LIST_SECTIONS[section][1](record) + " " + SECTION_TERMS[section])
+        counts = Counter(terms)
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[key] = count
+        self._docs[key] = _Document(
+            section, position, record, key[1], len(terms), frozenset(counts)
+        )
+        self._total_length += len(terms)
+
+    def _remove(self, key: DocKey) -> None:
+        doc = self._docs.pop(key)
+        self._total_length -= doc.length
+        for term in doc.terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def sync(self, snapshot: PortfolioSnapshot) -> None:
+        """Bring the index in line with ``snapshot``, touching only changes."""
+        for section in LIST_SECTIONS:
+            digest = snapshot.digests[section]
+            if section not in snapshot.sections or self._synced.get(section) == digest:
+                continue
+
+            current: Dict[DocKey, Tuple[int, Record]] = {}
+            for position, record in enumerate(getattr(snapshot, section)):
+                key = (section, content_digest(dict(record)))
+                current.setdefault(key, (position, record))
+
+            for key in [k for k in self._docs if k[0] == section and k not in current]:
+                self._remove(key)
+            for key, (position, record) in current.items():
+                doc = self._docs.get(key)
+                if doc is None:
+                    self._add(key, section, position, record)
+                else:
+                    doc.position = position
+            self._synced[section] = digest
+
+    def _scores(self, question: str) -> Dict[DocKey, float]:
+        n_docs = len(self._docs)
+        if not n_docs:
+            return {}
+
+        avg_length = self._total_length / n_docs
+        scores: Dict[DocKey, float] = {}
+        for term in set(index_terms(question)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                length = self._docs[key].length
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return scores
+
+    def select(self, snapshot: PortfolioSnapshot, question: str) -> PortfolioSnapshot:
+        """
+        Return a snapshot reduced to the ``top_k`` records most relevant to
+        ``question``, plus the personal info header.
+
+        The full snapshot is returned when nothing in the portfolio matches
+        the question or the portfolio is already within ``top_k`` records.
+        """
+        self.sync(snapshot)
+        if sum(1 for key in self._docs if key[0] in snapshot.sections) <= self.top_k:
+            return snapshot
+
+        scores = {
+            key: score for key, score in self._scores(question).items()
+            if key[0] in snapshot.sections
+        }
+        if not scores:
+            return snapshot
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[: self.top_k]
+        by_section: Dict[str, List[_Document]] = {
+            section: [] for section in LIST_SECTIONS if section in snapshot.sections
+        }
+        for key in ranked:
+            doc = self._docs[key]
+            by_section[doc.section].append(doc)
+
+        changes = {}
+        digests = dict(snapshot.digests)
+        for section, docs in by_section.items():
+            docs.sort(key=lambda d: d.position)
+            changes[section] = tuple(d.record for d in docs)
+            digests[section] = content_digest([d.digest for d in docs])
+        return dataclasses.replace(snapshot, digests=MappingProxyType(digests), **changes)
+
+
+# Singleton instance
+context_retriever = ContextRetriever(top_k=settings.RYA_RETRIEVAL_TOP_K)
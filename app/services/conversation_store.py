@@ -0,0 +1,191 @@
+"""
+Conversation Store - Server-side history for multi-turn Rya sessions.
+"""
+
+import re
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+SUMMARY_ANSWER_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@dataclass(frozen=True)
+class Turn:
+    """One question and the answer Rya gave."""
+
+    question: str
+    answer: str
+
+
+@dataclass(frozen=True)
+class Conversation:
+    """
+    History of one session: a compact summary of older turns followed by
+    the most recent turns verbatim.
+    """
+
+    session_id: str
+    summary: str = ""
+    turns: Tuple[Turn, ...] = ()
+    # time.monotonic() of the last turn
+    updated_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.summary and not self.turns
+
+    def render(self) -> str:
+        """Render the history for the prompt, oldest first."""
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier in this conversation:\n{self.summary}")
+        for turn in self.turns:
+            parts.append(f"Visitor: {turn.question}\nRya: {turn.answer}")
+        return "\n\n".join(parts)
+
+    def retrieval_hint(self) -> str:
+        """Text from the latest turn, so follow-ups retrieve what they refer to."""
+        if not self.turns:
+            return ""
+        last = self.turns[-1]
+        return f"{last.question} {last.answer}"
+
+
+def summarize_turn(turn: Turn) -> str:
+    """Fold a turn into one short line: the question and the answer's gist."""
+    gist = _SENTENCE_END.split(turn.answer.strip(), maxsplit=1)[0]
+    if len(gist) > SUMMARY_ANSWER_CHARS:
+        gist = gist[:SUMMARY_ANSWER_CHARS].rstrip() + "..."
+    return f"- Asked: {turn.question.strip()} / Answered: {gist}"
+
+
+def compact(conversation: Conversation, max_turns: int, max_summary_chars: int) -> Conversation:
+    """
+    Keep at most ``max_turns`` verbatim turns, folding older ones into the
+    summary; the summary keeps its most recent lines within
+    ``max_summary_chars``.
+    """
+    overflow = len(conversation.turns) - max_turns
+    if overflow <= 0:
+        return conversation
+
+    lines = conversation.summary.splitlines() if conversation.summary else []
+    lines.extend(summarize_turn(t) for t in conversation.turns[:overflow])
+    while lines and sum(len(line) + 1 for line in lines) > max_summary_chars:
+        lines.pop(0)
+    return replace(
+        conversation,
+        summary="\n".join(lines),
+        turns=conversation.turns[overflow:],
+    )
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(16)
+
+
+class ConversationStore(ABC):
+    """
+    Keyed storage for conversations.
+
+    Callers only use ``get``, ``append`` and ``delete`` with a session id,
+    so a database-backed store can replace the in-memory one without API
+    changes.
+    """
+
+    def __init__(self, max_turns: int, max_summary_chars: int):
+        self.max_turns = max_turns
+        self.max_summary_chars = max_summary_chars
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Conversation]:
+        """Return the session's conversation, or None if unknown or expired."""
+
+    @abstractmethod
+    async def append(self, session_id: str, question: str, answer: str) -> Conversation:
+        """Add a turn to the session (creating it if needed) and compact it."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> bool:
+        """Forget the session; return whether it existed."""
+
+
+class InMemoryConversationStore(ConversationStore):
+    """
+    Per-worker store with LRU eviction beyond ``max_sessions`` and expiry
+    after ``ttl_seconds`` without activity.
+    """
+
+    def __init__(self, max_sessions: int, ttl_seconds: float, max_turns: int, max_summary_chars: int):
+        super().__init__(max_turns, max_summary_chars)
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expired(self, conversation: Conversation, now: float) -> bool:
+        return now - conversation.updated_at >= self.ttl_seconds
+
+    async def get(self, session_id: str) -> Optional[Conversation]:
+        conversation = self._sessions.get(session_id)
+        if conversation is None:
+            return None
+        if self._expired(conversation, time.monotonic()):
+            del self._sessions[session_id]
+            self.expirations += 1
+            return None
+        self._sessions.move_to_end(session_id)
+        return conversation
+
+    async def append(self, session_id: str, question: str, answer: str) -> Conversation:
+        now = time.monotonic()
+        conversation = await self.get(session_id) or Conversation(session_id)
+        conversation = compact(
+            replace(conversation, turns=conversation.turns + (Turn(question, answer),), updated_at=now),
+            self.max_turns,
+            self.max_summary_chars,
+        )
+        self._sessions[session_id] = conversation
+        self._sessions.move_to_end(session_id)
+        self._evict(now)
+        return conversation
+
+    async def delete(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if self._expired(oldest, now):
+                self.expirations += 1
+            elif len(self._sessions) > self.max_sessions:
+                self.evictions += 1
+            else:
+                break
+            del self._sessions[session_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+# Singleton instance
+conversation_store = InMemoryConversationStore(
+    max_sessions=settings.RYA_SESSION_MAX_SESSIONS,
+    ttl_seconds=settings.RYA_SESSION_TTL_SECONDS,
+    max_turns=settings.RYA_SESSION_MAX_TURNS,
+    max_summary_chars=settings.RYA_SESSION_SUMMARY_MAX_CHARS,
+)
@@ -4,10 +4,11 @@ Experience Service - Business logic layer.
 
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Experience
+from app.services.portfolio_snapshot import portfolio_snapshot_store
+from app.services.queries import ALL_EXPERIENCES, EXPERIENCE_BY_ID
 from app.schemas import ExperienceCreate, ExperienceUpdate
 
 
@@ -19,16 +20,12 @@ class ExperienceService:
 
     async def get_all_experiences(self) -> List[Experience]:
         """Get all experiences ordered by start date."""
-        result = await self.db.execute(
-            select(Experience).order_by(Experience.start_date.desc())
-        )
+        result = await self.db.execute(ALL_EXPERIENCES)
         return list(result.scalars().all())
 
     async def get_experience_by_id(self, exp_id: UUID) -> Optional[Experience]:
         """Get an experience by ID."""
-        result = await self.db.execute(
-            select(Experience).where(Experience.id == exp_id)
-        )
+        result = await self.db.execute(EXPERIENCE_BY_ID, {"id": exp_id})
         return result.scalar_one_or_none()
 
     async def create_experience(self, data: ExperienceCreate) -> Experience:
@@ -37,15 +34,14 @@ class ExperienceService:
         self.db.add(experience)
         await self.db.flush()
         await self.db.refresh(experience)
+        portfolio_snapshot_store.invalidate(self.db)
         return experience
 
     async def update_experience(
         self, exp_id: UUID, data: ExperienceUpdate
     ) -> Optional[Experience]:
         """Update an experience."""
-        result = await self.db.execute(
-            select(Experience).where(Experience.id == exp_id)
-        )
+        result = await self.db.execute(EXPERIENCE_BY_ID, {"id": exp_id})
         experience = result.scalar_one_or_none()
 
         if experience:
@@ -54,17 +50,17 @@ class ExperienceService:
                 setattr(experience, field, value)
             await self.db.flush()
             await self.db.refresh(experience)
+            portfolio_snapshot_store.invalidate(self.db)
 
         return experience
 
     async def delete_experience(self, exp_id: UUID) -> bool:
         """Delete an experience."""
-        result = await self.db.execute(
-            select(Experience).where(Experience.id == exp_id)
-        )
+        result = await self.db.execute(EXPERIENCE_BY_ID, {"id": exp_id})
         experience = result.scalar_one_or_none()
 
         if experience:
             await self.db.delete(experience)
+            portfolio_snapshot_store.invalidate(self.db)
             return True
         return False
@@ -0,0 +1,352 @@
+"""
+FAQ Service - Precomputed answers to the questions visitors ask most.
+"""
+
+import asyncio
+import logging
+import random
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import AIContextLog, AIFAQAnswer
+from app.services.portfolio_snapshot import PortfolioSnapshot, portfolio_snapshot_store
+from app.utils.text import index_terms
+
+logger = logging.getLogger(__name__)
+
+AnswerFn = Callable[[str, PortfolioSnapshot], Awaitable[str]]
+SnapshotLoader = Callable[[], Awaitable[PortfolioSnapshot]]
+
+# (question, client hash or None) as logged
+LoggedQuestion = Tuple[str, Optional[str]]
+
+# Shared answers for other portfolio content are kept this long
+SHARED_ANSWER_RETENTION = timedelta(days=1)
+
+
+def same_content(snapshot: PortfolioSnapshot, digests: Optional[Mapping[str, str]]) -> bool:
+    """Whether the sections ``snapshot`` loaded hold the content of ``digests``."""
+    return digests is not None and all(
+        snapshot.digests[name] == digests[name] for name in snapshot.sections
+    )
+
+
+def question_terms(question: str) -> FrozenSet[str]:
+    return frozenset(index_terms(question))
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two term sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class Intent:
+    """A cluster of similar logged questions."""
+
+    question: str
+    terms: FrozenSet[str]
+    count: int
+    # Distinct clients that asked it
+    clients: int = 1
+
+
+def mine_intents(
+    questions: List[LoggedQuestion],
+    top_n: int,
+    min_clients: int,
+    cluster_similarity: float,
+) -> List[Intent]:
+    """
+    Group questions into intents and return the ``top_n`` most frequent.
+
+    Questions with the same terms are counted together; term sets are then
+    merged greedily, most frequent first, into the first cluster they
+    resemble by at least ``cluster_similarity``. Each intent is represented
+    by its most frequent wording.
+
+    Only intents asked by at least ``min_clients`` distinct clients qualify,
+    so one visitor repeating a question cannot put it in the FAQ. Questions
+    logged without a client count as a single client.
+    """
+    by_terms: Dict[FrozenSet[str], Tuple[Counter, Set[Optional[str]]]] = {}
+    for question, client in questions:
+        terms = question_terms(question)
+        if terms:
+            wordings, clients = by_terms.setdefault(terms, (Counter(), set()))
+            wordings[question.strip()] += 1
+            clients.add(client)
+
+    # cluster seed terms -> (wordings, clients)
+    clusters: List[Tuple[FrozenSet[str], Counter, Set[Optional[str]]]] = []
+    for terms, (wordings, clients) in sorted(
+        by_terms.items(), key=lambda item: -sum(item[1][0].values())
+    ):
+        for seed, members, askers in clusters:
+            if similarity(seed, terms) >= cluster_similarity:
+                members.update(wordings)
+                askers.update(clients)
+                break
+        else:
+            clusters.append((terms, Counter(wordings), set(clients)))
+
+    intents = [
+        Intent(members.most_common(1)[0][0], seed, sum(members.values()), len(askers))
+        for seed, members, askers in clusters
+    ]
+    intents = [i for i in intents if i.clients >= min_clients]
+    intents.sort(key=lambda i: -i.count)
+    return intents[:top_n]
+
+
+async def load_logged_questions(session: AsyncSession, limit: int) -> List[LoggedQuestion]:
+    """Return the ``limit`` most recently logged visitor questions and their clients."""
+    result = await session.execute(
+        select(AIContextLog.user_question, AIContextLog.client_hash)
+        .order_by(AIContextLog.created_at.desc())
+        .limit(limit)
+    )
+    return [(question, client) for question, client in result.all()]
+
+
+def _intent_key(terms: FrozenSet[str]) -> str:
+    return " ".join(sorted(terms))
+
+
+class SharedFAQAnswers:
+    """
+    FAQ answers stored in the database, so workers answer each intent once
+    per portfolio content instead of once each.
+
+    Answers are keyed by the snapshot's ``content_key``, which is the same
+    in every process for the same data.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+        self.reused = 0
+
+    async def get(self, content_key: str, terms: FrozenSet[str]) -> Optional[str]:
+        async with self.session_factory() as session:
+            answer = (
+                await session.execute(
+                    select(AIFAQAnswer.answer).where(
+                        AIFAQAnswer.content_key == content_key,
+                        AIFAQAnswer.intent == _intent_key(terms),
+                    )
+                )
+            ).scalar_one_or_none()
+        if answer is not None:
+            self.reused += 1
+        return answer
+
+    async def put(self, content_key: str, intent: Intent, answer: str) -> None:
+        """Store an answer; another worker's answer for the same intent wins."""
+        async with self.session_factory() as session:
+            await session.execute(
+                pg_insert(AIFAQAnswer)
+                .values(
+                    content_key=content_key,
+                    intent=_intent_key(intent.terms),
+                    question=intent.question,
+                    answer=answer,
+                    created_at=datetime.utcnow(),
+                )
+                .on_conflict_do_nothing()
+            )
+            await session.commit()
+
+    async def prune(self, content_key: str) -> None:
+        """Delete old answers for content other than ``content_key``."""
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(AIFAQAnswer).where(
+                    AIFAQAnswer.content_key != content_key,
+                    AIFAQAnswer.created_at < datetime.utcnow() - SHARED_ANSWER_RETENTION,
+                )
+            )
+            await session.commit()
+
+
+class FAQIndex:
+    """
+    Answers to frequent intents, precomputed for one portfolio content.
+
+    Intents are mined periodically from the interaction logs. Answers are
+    tied to the content of the full snapshot they were computed from; they
+    are dropped when portfolio data changes and regenerated lazily, in the
+    background, the next time a question arrives for the new content.
+
+    Regeneration waits a random delay of up to ``stagger`` seconds, so the
+    workers of a deployment do not all start at once, and reuses answers
+    other workers already put in ``shared``.
+    """
+
+    def __init__(
+        self,
+        top_n: int,
+        min_clients: int,
+        cluster_similarity: float,
+        match_similarity: float,
+        log_window: int,
+        refresh_interval: float,
+        stagger: float = 0.0,
+        shared: Optional[SharedFAQAnswers] = None,
+    ):
+        self.top_n = top_n
+        self.min_clients = min_clients
+        self.cluster_similarity = cluster_similarity
+        self.match_similarity = match_similarity
+        self.log_window = log_window
+        self.refresh_interval = refresh_interval
+        self.stagger = stagger
+        self.shared = shared
+        self._intents: List[Intent] = []
+        self._answers: Dict[FrozenSet[str], str] = {}
+        # Section digests of the snapshot the answers were computed from
+        self._content: Optional[Mapping[str, str]] = None
+        self._refresh: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+
+    def set_intents(self, intents: List[Intent]) -> None:
+        """Replace the mined intents; their answers are recomputed lazily."""
+        self._intents = intents
+        if self._refresh is not None:
+            self._refresh.cancel()
+        self.invalidate()
+
+    def invalidate(self, *_args) -> None:
+        """Drop precomputed answers (portfolio data or intents changed)."""
+        self._answers = {}
+        self._content = None
+
+    def lookup(self, question: str, snapshot: PortfolioSnapshot) -> Optional[str]:
+        """Return the precomputed answer of a matching intent for ``snapshot``."""
+        if not self._answers or not same_content(snapshot, self._content):
+            return None
+        terms = question_terms(question)
+        best, best_score = None, self.match_similarity
+        for intent_terms, answer in self._answers.items():
+            score = similarity(terms, intent_terms)
+            if score >= best_score:
+                best, best_score = answer, score
+        if best is not None:
+            self.hits += 1
+        return best
+
+    def ensure_fresh(
+        self, snapshot: PortfolioSnapshot, answer: AnswerFn, load_full: SnapshotLoader
+    ) -> None:
+        """
+        Start regenerating answers unless they are current for ``snapshot``.
+
+        Answers are always computed from the full portfolio; when ``snapshot``
+        only holds some sections, ``load_full`` provides it.
+        """
+        if (
+            not self._intents
+            or same_content(snapshot, self._content)
+            or (self._refresh is not None and not self._refresh.done())
+        ):
+            return
+        self._refresh = asyncio.create_task(
+            self._regenerate(snapshot, answer, load_full), name="faq-precompute"
+        )
+
+    async def _regenerate(
+        self, snapshot: PortfolioSnapshot, answer: AnswerFn, load_full: SnapshotLoader
+    ) -> None:
+        if self.stagger > 0:
+            await asyncio.sleep(random.uniform(0, self.stagger))
+        if not snapshot.is_complete:
+            snapshot = await load_full()
+        await self.precompute(snapshot, answer)
+
+    async def _answer_intent(self, intent: Intent, snapshot: PortfolioSnapshot, answer: AnswerFn) -> str:
+        if self.shared is None:
+            return await answer(intent.question, snapshot)
+        text = await self.shared.get(snapshot.content_key, intent.terms)
+        if text is None:
+            text = await answer(intent.question, snapshot)
+            await self.shared.put(snapshot.content_key, intent, text)
+        return text
+
+    async def precompute(self, snapshot: PortfolioSnapshot, answer: AnswerFn) -> None:
+        """
+        Answer every intent against ``snapshot``; failed intents are skipped.
+
+        Answers another worker stored for the same content are reused
+        instead of asking the model again.
+        """
+        answers: Dict[FrozenSet[str], str] = {}
+        for intent in self._intents:
+            try:
+                answers[intent.terms] = await self._answer_intent(intent, snapshot, answer)
+            except Exception:
+                logger.exception("Failed to precompute FAQ answer for %r", intent.question)
+            if portfolio_snapshot_store.version != snapshot.version:
+                # Data changed meanwhile; the next question starts over
+                return
+        self._answers, self._content = answers, snapshot.digests
+        logger.info("Precomputed %d FAQ answers", len(answers))
+        if self.shared is not None:
+            try:
+                await self.shared.prune(snapshot.content_key)
+            except Exception:
+                logger.exception("Failed to prune shared FAQ answers")
+
+    def start(self, job: Callable[[], Awaitable[None]]) -> None:
+        """Run ``job`` (mine intents and precompute) now and then periodically."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(job), name="faq-refresh")
+
+    async def stop(self) -> None:
+        for task in (self._task, self._refresh):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._task = self._refresh = None
+
+    async def _run(self, job: Callable[[], Awaitable[None]]) -> None:
+        while True:
+            try:
+                await job()
+            except Exception:
+                logger.exception("FAQ refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "intents": len(self._intents),
+            "answers": len(self._answers),
+            "hits": self.hits,
+            "shared_reused": self.shared.reused if self.shared is not None else 0,
+        }
+
+
+# Singleton instance
+faq_index = FAQIndex(
+    top_n=settings.RYA_FAQ_TOP_N,
+    min_clients=settings.RYA_FAQ_MIN_CLIENTS,
+    cluster_similarity=settings.RYA_FAQ_CLUSTER_SIMILARITY,
+    match_similarity=settings.RYA_FAQ_MATCH_SIMILARITY,
+    log_window=settings.RYA_FAQ_LOG_WINDOW,
+    refresh_interval=settings.RYA_FAQ_REFRESH_SECONDS,
+    stagger=settings.RYA_FAQ_STAGGER_SECONDS,
+    shared=SharedFAQAnswers(AsyncSessionLocal),
+)
+portfolio_snapshot_store.add_listener(faq_index.invalidate)
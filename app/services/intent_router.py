@@ -0,0 +1,110 @@
+"""
+Intent Router - Maps a question to the portfolio sections it needs.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.portfolio_snapshot import ALL_SECTIONS
+from app.utils.text import index_terms
+
+# Words pointing at each section, as stemmed by ``index_terms``
+SECTION_LEXICON: Dict[str, FrozenSet[str]] = {
+    "personal_info": frozenset(index_terms(
+        "about bio background contact email mail reach hire location located live based "
+        "linkedin github profile name title introduce yourself summary available"
+    )),
+    "skills": frozenset(index_terms(
+        "skill skills technology technologies tech stack tools tool language languages "
+        "framework frameworks library libraries proficient proficiency expertise expert "
+        "know knows familiar database databases cloud"
+    )),
+    "certifications": frozenset(index_terms(
+        "certification certifications certificate certificates certified credential "
+        "credentials course courses license issued issuer qualification"
+    )),
+    "projects": frozenset(index_terms(
+        "project projects built build building app apps application applications demo "
+        "repo repository side portfolio created made developed live"
+    )),
+    "experience": frozenset(index_terms(
+        "experience experienced work worked working job jobs role roles company companies "
+        "career employment employer employed position internship intern team years "
+        "learned learnings responsibilities"
+    )),
+}
+
+# Content words that do not point at any section but do not make a question
+# less clear either
+NEUTRAL_TERMS = frozenset(index_terms(
+    "use used using have done like more detail details most best recent latest "
+    "current currently previous many much kind type good mention"
+))
+
+routed_questions = metrics.counter(
+    "rya_routed_questions_total",
+    "Rya questions by whether they were routed to specific sections",
+    labelnames=("route",),
+)
+
+
+@dataclass(frozen=True)
+class Route:
+    """Sections a question needs, and how sure the router is."""
+
+    sections: FrozenSet[str]
+    confidence: float
+
+    @property
+    def is_full(self) -> bool:
+        return self.sections == ALL_SECTIONS
+
+
+FULL_ROUTE = Route(ALL_SECTIONS, 0.0)
+
+
+class IntentRouter:
+    """
+    Keyword classifier from questions to portfolio sections.
+
+    Confidence is the share of the question's content words found in a
+    section lexicon. Words the lexicons do not know (a technology, a company
+    name) could live in any section, so below ``min_confidence`` the question
+    gets the full portfolio. Personal info is always included.
+    """
+
+    def __init__(self, min_confidence: float, enabled: bool = True):
+        self.min_confidence = min_confidence
+        self.enabled = enabled
+
+    def route(self, question: str) -> Route:
+        """Return the sections needed to answer ``question``."""
+        if not self.enabled:
+            return FULL_ROUTE
+
+        terms = [t for t in index_terms(question) if t not in NEUTRAL_TERMS]
+        sections = set()
+        matched = 0
+        for term in terms:
+            hits = [name for name, lexicon in SECTION_LEXICON.items() if term in lexicon]
+            if hits:
+                matched += 1
+                sections.update(hits)
+
+        confidence = matched / len(terms) if terms else 0.0
+        if not sections or confidence < self.min_confidence:
+            routed_questions.inc(route="full")
+            return Route(FULL_ROUTE.sections, confidence)
+
+        sections.add("personal_info")
+        routed_questions.inc(route="sections")
+        return Route(frozenset(sections), confidence)
+
+
+# Singleton instance
+intent_router = IntentRouter(
+    min_confidence=settings.RYA_ROUTING_MIN_CONFIDENCE,
+    enabled=settings.RYA_ROUTING_ENABLED,
+)
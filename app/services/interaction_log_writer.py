@@ -0,0 +1,261 @@
+"""
+Interaction Log Writer - Batches AIContextLog inserts off the request path.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import AIContextLog, AIContextSnapshot
+from app.services.analytics_service import update_rollups
+
+logger = logging.getLogger(__name__)
+
+QUEUE_POLICIES = ("drop", "block")
+
+
+def _jsonb_order(value: Any) -> Any:
+    if isinstance(value, dict):
+        keys = sorted(value, key=lambda k: (len(k.encode("utf-8")), k.encode("utf-8")))
+        return {k: _jsonb_order(value[k]) for k in keys}
+    if isinstance(value, (list, tuple)):
+        return [_jsonb_order(v) for v in value]
+    return value
+
+
+def context_hash(context: Dict[str, Any]) -> str:
+    """
+    Return the content address of an AI context.
+
+    This is the sha256 of the context's ``jsonb::text`` form (keys ordered by
+    length then bytes, ``", "``/``": "`` separators), so hashes computed here
+    match the ones the backfill migration computes in SQL.
+    """
+    text = json.dumps(_jsonb_order(context), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_log_row(
+    question: str,
+    response: str,
+    context: Dict[str, Any],
+    prompt_tokens: Optional[int] = None,
+    client_hash: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build an ``ai_context_logs`` row plus the context it references."""
+    return {
+        "user_question": question,
+        "ai_response": response,
+        "context": context,
+        "prompt_tokens": prompt_tokens,
+        "client_hash": client_hash,
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def insert_log_rows(
+    session: AsyncSession,
+    rows: List[Dict[str, Any]],
+    known_hashes=(),
+) -> Set[str]:
+    """
+    Insert interaction logs, storing each distinct context only once.
+
+    Contexts go to ``context_snapshots`` (skipping hashes in
+    ``known_hashes``, and any already stored); log rows only keep the hash.
+    The daily analytics rollups are updated in the same transaction.
+
+    Returns:
+        Hashes of every context referenced by ``rows``
+    """
+    snapshots: Dict[str, Dict[str, Any]] = {}
+    logs = []
+    for row in rows:
+        digest = context_hash(row["context"])
+        if digest not in known_hashes:
+            snapshots.setdefault(digest, row["context"])
+        logs.append(
+            {
+                "user_question": row["user_question"],
+                "ai_response": row["ai_response"],
+                "context_hash": digest,
+                "prompt_tokens": row["prompt_tokens"],
+                "client_hash": row["client_hash"],
+                "created_at": row["created_at"],
+            }
+        )
+
+    if snapshots:
+        await session.execute(
+            pg_insert(AIContextSnapshot).on_conflict_do_nothing(index_elements=["hash"]),
+            [{"hash": h, "context": c} for h, c in snapshots.items()],
+        )
+    await session.execute(insert(AIContextLog), logs)
+    await update_rollups(session, logs)
+    return {log["context_hash"] for log in logs}
+
+
+class InteractionLogWriter:
+    """
+    Background writer for Rya interaction logs.
+
+    Requests enqueue rows in memory and return immediately; a single task
+    writes them with one multi-row INSERT per batch, flushing whenever
+    ``batch_size`` rows are waiting or ``flush_interval`` seconds have passed
+    since the first row of the batch arrived.
+
+    The queue holds at most ``max_queue`` rows. When it is full, the
+    ``drop`` policy discards the new row (counted in ``dropped``) and the
+    ``block`` policy makes the request wait for room.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        policy: str = "drop",
+        session_factory=AsyncSessionLocal,
+    ):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown log queue policy: {policy!r}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.policy = policy
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._batch: List[Dict[str, Any]] = []
+        # Recently written context hashes, to skip re-inserting snapshots
+        self._known_hashes: "OrderedDict[str, None]" = OrderedDict()
+        self.max_known_hashes = 1024
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flush task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name="interaction-log-writer")
+
+    async def submit(
+        self,
+        question: str,
+        response: str,
+        context: Dict[str, Any],
+        prompt_tokens: Optional[int] = None,
+        client_hash: Optional[str] = None,
+    ) -> None:
+        """Queue one interaction for writing, applying the queue policy when full."""
+        row = make_log_row(question, response, context, prompt_tokens, client_hash)
+        if self.policy == "block":
+            await self._queue.put(row)
+            return
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def stop(self) -> None:
+        """Stop the flush task and write every row still queued."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+        # A batch being written when the task was cancelled kept going
+        if self._inflight is not None:
+            with suppress(Exception):
+                await self._inflight
+
+        batch, self._batch = self._batch, []
+        batch.extend(self._take(self.batch_size - len(batch)))
+        while batch:
+            await self._write(batch)
+            batch = self._take(self.batch_size)
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < limit and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Rows collected so far live on the instance so that stop() can
+            # still write them if the loop is cancelled mid-batch.
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._batch) < self.batch_size:
+                self._batch.extend(self._take(self.batch_size - len(self._batch)))
+                remaining = deadline - loop.time()
+                if len(self._batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            batch, self._batch = self._batch, []
+            # Shielded so cancelling the loop on shutdown never loses a batch
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            async with self.session_factory() as session:
+                hashes = await insert_log_rows(session, rows, self._known_hashes)
+                await session.commit()
+            self.written += len(rows)
+            for digest in hashes:
+                self._known_hashes[digest] = None
+                self._known_hashes.move_to_end(digest)
+            while len(self._known_hashes) > self.max_known_hashes:
+                self._known_hashes.popitem(last=False)
+        except Exception:
+            self.failed += len(rows)
+            logger.exception("Failed to write %d Rya interaction logs", len(rows))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and write counters."""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "policy": self.policy,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+interaction_log_writer = InteractionLogWriter(
+    batch_size=settings.RYA_LOG_BATCH_SIZE,
+    flush_interval=settings.RYA_LOG_FLUSH_INTERVAL_SECONDS,
+    max_queue=settings.RYA_LOG_QUEUE_SIZE,
+    policy=settings.RYA_LOG_QUEUE_POLICY,
+)
@@ -4,10 +4,11 @@ Personal Info Service - Business logic layer.
 
 from typing import Optional
 from uuid import UUID
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import PersonalInfo
+from app.services.portfolio_snapshot import portfolio_snapshot_store
+from app.services.queries import PERSONAL_INFO, PERSONAL_INFO_BY_ID
 from app.schemas import PersonalInfoCreate, PersonalInfoUpdate
 
 
@@ -19,7 +20,7 @@ class PersonalInfoService:
 
     async def get_personal_info(self) -> Optional[PersonalInfo]:
         """Get the personal info (single record)."""
-        result = await self.db.execute(select(PersonalInfo).limit(1))
+        result = await self.db.execute(PERSONAL_INFO)
         return result.scalar_one_or_none()
 
     async def create_personal_info(self, data: PersonalInfoCreate) -> PersonalInfo:
@@ -28,15 +29,14 @@ class PersonalInfoService:
         self.db.add(personal_info)
         await self.db.flush()
         await self.db.refresh(personal_info)
+        portfolio_snapshot_store.invalidate(self.db)
         return personal_info
 
     async def update_personal_info(
         self, id: UUID, data: PersonalInfoUpdate
     ) -> Optional[PersonalInfo]:
         """Update personal info."""
-        result = await self.db.execute(
-            select(PersonalInfo).where(PersonalInfo.id == id)
-        )
+        result = await self.db.execute(PERSONAL_INFO_BY_ID, {"id": id})
         personal_info = result.scalar_one_or_none()
 
         if personal_info:
@@ -45,5 +45,6 @@ class PersonalInfoService:
                 setattr(personal_info, field, value)
             await self.db.flush()
             await self.db.refresh(personal_info)
+            portfolio_snapshot_store.invalidate(self.db)
 
         return personal_info
@@ -0,0 +1,266 @@
+"""
+Portfolio Snapshot - Versioned in-process cache of the Rya portfolio context.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, replace
+from functools import cached_property
+from types import MappingProxyType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Session.info flag: this transaction changed portfolio data
+_PENDING_INVALIDATION = "portfolio_snapshot_invalidate"
+
+# Context sections, in prompt order
+SECTIONS = ("personal_info", "skills", "certifications", "projects", "experience")
+ALL_SECTIONS = frozenset(SECTIONS)
+
+Record = Mapping[str, Any]
+
+
+def _freeze(record: Dict[str, Any]) -> Record:
+    """Return a read-only view of a context record (lists become tuples)."""
+    return MappingProxyType(
+        {k: tuple(v) if isinstance(v, list) else v for k, v in record.items()}
+    )
+
+
+def _thaw(record: Record) -> Dict[str, Any]:
+    """Return a plain, JSON-serializable copy of a frozen record."""
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in record.items()}
+
+
+def content_digest(value: Any) -> str:
+    """Return a stable hash of JSON-compatible content."""
+    payload = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshot:
+    """Immutable view of the portfolio data Rya answers from."""
+
+    version: int
+    loaded_at: float
+    personal_info: Optional[Record]
+    skills: Tuple[Record, ...]
+    certifications: Tuple[Record, ...]
+    projects: Tuple[Record, ...]
+    experience: Tuple[Record, ...]
+    # Content hash per section, used to reuse rendered prompt fragments
+    digests: Mapping[str, str]
+    # Sections actually loaded; the others are left empty
+    sections: FrozenSet[str] = ALL_SECTIONS
+
+    @property
+    def is_complete(self) -> bool:
+        return self.sections == ALL_SECTIONS
+
+    @cached_property
+    def content_key(self) -> str:
+        """
+        Hash of the loaded sections' content.
+
+        Unlike ``version``, it is the same in every process for the same
+        data, so it can key anything derived from the data.
+        """
+        return content_digest({name: self.digests[name] for name in sorted(self.sections)})
+
+    @classmethod
+    def from_context(
+        cls,
+        version: int,
+        context: Dict[str, Any],
+        sections: Collection[str] = ALL_SECTIONS,
+        loaded_at: Optional[float] = None,
+    ) -> "PortfolioSnapshot":
+        """Build a snapshot from the dict returned by the context loader."""
+        personal_info = context.get("personal_info")
+        return cls(
+            version=version,
+            loaded_at=time.monotonic() if loaded_at is None else loaded_at,
+            personal_info=_freeze(personal_info) if personal_info else None,
+            skills=tuple(_freeze(r) for r in context.get("skills", [])),
+            certifications=tuple(_freeze(r) for r in context.get("certifications", [])),
+            projects=tuple(_freeze(r) for r in context.get("projects", [])),
+            experience=tuple(_freeze(r) for r in context.get("experience", [])),
+            digests=MappingProxyType(
+                {name: content_digest(context.get(name)) for name in SECTIONS}
+            ),
+            sections=frozenset(sections),
+        )
+
+    def to_context(self) -> Dict[str, Any]:
+        """Return a fresh, mutable copy of the loaded sections in the context dict shape."""
+        context: Dict[str, Any] = {}
+        if self.personal_info is not None:
+            context["personal_info"] = _thaw(self.personal_info)
+        for name in SECTIONS[1:]:
+            if name in self.sections:
+                context[name] = [_thaw(r) for r in getattr(self, name)]
+        return context
+
+    def merge(self, selections: Sequence["PortfolioSnapshot"]) -> "PortfolioSnapshot":
+        """
+        Return this snapshot reduced to the records kept by any of
+        ``selections`` (narrowed views of it, e.g. per-question retrieval),
+        in this snapshot's order.
+
+        Sections no selection loaded are left out.
+        """
+        sections = frozenset().union(*(s.sections for s in selections)) & self.sections
+        digests = dict(self.digests)
+        changes: Dict[str, Any] = {}
+        for name in SECTIONS[1:]:
+            parts = [s for s in selections if name in s.sections]
+            if not parts or any(s.digests[name] == self.digests[name] for s in parts):
+                continue
+            kept = {content_digest(dict(r)) for s in parts for r in getattr(s, name)}
+            records, record_digests = [], []
+            for record in getattr(self, name):
+                digest = content_digest(dict(record))
+                if digest in kept:
+                    records.append(record)
+                    record_digests.append(digest)
+            changes[name] = tuple(records)
+            digests[name] = content_digest(record_digests)
+        return replace(self, sections=sections, digests=MappingProxyType(digests), **changes)
+
+
+class PortfolioSnapshotStore:
+    """
+    Holds the current portfolio snapshot and its data version.
+
+    Every portfolio write bumps the version; the next reader reloads the
+    snapshot once and everyone else reuses it without touching the database.
+    The version is per process, so ``max_age_seconds`` bounds how long other
+    workers keep serving data from before an edit they did not see.
+
+    Sections are cached and loaded individually, so a reader that only needs
+    some of them never loads the rest.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._version = 0
+        # section -> (version, loaded_at, raw loader output)
+        self._sections: Dict[str, Tuple[int, float, Any]] = {}
+        # Assembled snapshots per set of sections
+        self._snapshots: Dict[FrozenSet[str], PortfolioSnapshot] = {}
+        self._lock = asyncio.Lock()
+        self._listeners: List[Callable[[int], None]] = []
+
+    @property
+    def version(self) -> int:
+        """Current portfolio data version."""
+        return self._version
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        """Call ``listener(new_version)`` whenever the version is bumped."""
+        self._listeners.append(listener)
+
+    def invalidate(self, db: Optional[AsyncSession] = None) -> int:
+        """
+        Bump the data version after a portfolio write.
+
+        When the writing session is passed, the version is bumped again once
+        that session commits, so a reload racing with the uncommitted write
+        cannot pin pre-edit data under the new version.
+        """
+        self._version += 1
+        if db is not None:
+            db.sync_session.info[_PENDING_INVALIDATION] = True
+        for listener in self._listeners:
+            listener(self._version)
+        return self._version
+
+    def _is_fresh(self, version: int, loaded_at: float) -> bool:
+        return version == self._version and time.monotonic() - loaded_at < self.max_age_seconds
+
+    def _is_current(self, snapshot: Optional[PortfolioSnapshot]) -> bool:
+        return snapshot is not None and self._is_fresh(snapshot.version, snapshot.loaded_at)
+
+    async def get(
+        self,
+        loader: Callable[[Collection[str]], Awaitable[Dict[str, Any]]],
+        sections: Collection[str] = ALL_SECTIONS,
+    ) -> PortfolioSnapshot:
+        """
+        Return a current snapshot of ``sections``.
+
+        ``loader(names)`` is called only for sections that are stale and
+        returns their raw context. Concurrent callers that find sections
+        stale share a single reload.
+        """
+        names = frozenset(sections)
+        snapshot = self._snapshots.get(names)
+        if self._is_current(snapshot):
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._snapshots.get(names)
+            if self._is_current(snapshot):
+                return snapshot
+
+            version = self._version
+            stale = [
+                name for name in SECTIONS
+                if name in names
+                and not (name in self._sections and self._is_fresh(*self._sections[name][:2]))
+            ]
+            if stale:
+                context = await loader(stale)
+                loaded_at = time.monotonic()
+                for name in stale:
+                    self._sections[name] = (version, loaded_at, context.get(name))
+
+            entries = [self._sections[name] for name in names]
+            snapshot = PortfolioSnapshot.from_context(
+                version,
+                {name: self._sections[name][2] for name in names},
+                sections=names,
+                loaded_at=min(entry[1] for entry in entries),
+            )
+            if any(entry[0] != version for entry in entries):
+                # Data changed while loading; serve it but do not keep it
+                return snapshot
+            self._snapshots[names] = snapshot
+            return snapshot
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_PENDING_INVALIDATION, False):
+        portfolio_snapshot_store.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidation(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATION, None)
+
+
+# Singleton instance
+portfolio_snapshot_store = PortfolioSnapshotStore(
+    max_age_seconds=settings.RYA_SNAPSHOT_MAX_AGE_SECONDS
+)
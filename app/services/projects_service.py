@@ -4,10 +4,11 @@ Projects Service - Business logic layer.
 
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Project
+from app.services.portfolio_snapshot import portfolio_snapshot_store
+from app.services.queries import ALL_PROJECTS, PROJECT_BY_ID, PROJECTS_BY_TYPE
 from app.schemas import ProjectCreate, ProjectUpdate
 
 
@@ -19,21 +20,17 @@ class ProjectService:
 
     async def get_all_projects(self) -> List[Project]:
         """Get all projects."""
-        result = await self.db.execute(select(Project).order_by(Project.created_at.desc()))
+        result = await self.db.execute(ALL_PROJECTS)
         return list(result.scalars().all())
 
     async def get_project_by_id(self, project_id: UUID) -> Optional[Project]:
         """Get a project by ID."""
-        result = await self.db.execute(
-            select(Project).where(Project.id == project_id)
-        )
+        result = await self.db.execute(PROJECT_BY_ID, {"id": project_id})
         return result.scalar_one_or_none()
 
     async def get_projects_by_type(self, project_type: str) -> List[Project]:
         """Get projects by type."""
-        result = await self.db.execute(
-            select(Project).where(Project.project_type == project_type)
-        )
+        result = await self.db.execute(PROJECTS_BY_TYPE, {"project_type": project_type})
         return list(result.scalars().all())
 
     async def create_project(self, data: ProjectCreate) -> Project:
@@ -42,15 +39,14 @@ class ProjectService:
         self.db.add(project)
         await self.db.flush()
         await self.db.refresh(project)
+        portfolio_snapshot_store.invalidate(self.db)
         return project
 
     async def update_project(
         self, project_id: UUID, data: ProjectUpdate
     ) -> Optional[Project]:
         """Update a project."""
-        result = await self.db.execute(
-            select(Project).where(Project.id == project_id)
-        )
+        result = await self.db.execute(PROJECT_BY_ID, {"id": project_id})
         project = result.scalar_one_or_none()
 
         if project:
@@ -59,17 +55,17 @@ class ProjectService:
                 setattr(project, field, value)
             await self.db.flush()
             await self.db.refresh(project)
+            portfolio_snapshot_store.invalidate(self.db)
 
         return project
 
     async def delete_project(self, project_id: UUID) -> bool:
         """Delete a project."""
-        result = await self.db.execute(
-            select(Project).where(Project.id == project_id)
-        )
+        result = await self.db.execute(PROJECT_BY_ID, {"id": project_id})
         project = result.scalar_one_or_none()
 
         if project:
             await self.db.delete(project)
+            portfolio_snapshot_store.invalidate(self.db)
             return True
         return False
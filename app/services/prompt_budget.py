@@ -0,0 +1,223 @@
+"""
+Prompt Budget - Keeps the Rya prompt within a token budget.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.prompts.rya_system_prompt import (
+    RYA_BATCH_TEMPLATE,
+    RYA_FOLLOW_UP_TEMPLATE,
+    RYA_PROMPT_TEMPLATE,
+    RYA_SYSTEM_PROMPT,
+)
+from app.services.context_renderer import (
+    LIST_SECTIONS,
+    context_renderer,
+    join_sections,
+)
+from app.services.portfolio_snapshot import PortfolioSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Sections are shortened (trailing records first) and then dropped in this
+# order until the prompt fits; personal info is only cut as a last resort.
+SECTION_DROP_ORDER = ("certifications", "skills", "experience", "projects")
+
+TRUNCATION_MARK = " [...]"
+
+prompt_tokens_histogram = metrics.histogram(
+    "rya_prompt_tokens",
+    "Estimated tokens in prompts sent to the model",
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+prompt_truncations = metrics.counter(
+    "rya_prompt_truncations_total",
+    "Prompt parts truncated or dropped to fit the token budget",
+    labelnames=("part",),
+)
+
+
+@dataclass(frozen=True)
+class PromptPlan:
+    """Question and context that fit the budget, with what had to give."""
+
+    question: str
+    context: str
+    tokens: int
+    question_truncated: bool = False
+    shortened_sections: Tuple[str, ...] = ()
+    dropped_sections: Tuple[str, ...] = ()
+    # Leading records kept of each shortened section
+    kept_records: Mapping[str, int] = field(default_factory=dict)
+
+    def used_context(self, snapshot: PortfolioSnapshot) -> Dict[str, Any]:
+        """The part of ``snapshot``'s context this plan actually sends."""
+        context = snapshot.to_context()
+        for name in self.dropped_sections:
+            context.pop(name, None)
+        for name, kept in self.kept_records.items():
+            context[name] = context[name][:kept]
+        return context
+
+
+class PromptBudgeter:
+    """
+    Fits the question and portfolio context into ``max_tokens``.
+
+    Token counts are estimated from character length (``chars_per_token``),
+    which is cheap and close enough for budgeting. Within budget, the plan is
+    just the cached rendered context.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        max_question_tokens: int,
+        max_history_tokens: int = 0,
+        chars_per_token: float = 4.0,
+    ):
+        self.max_tokens = max_tokens
+        self.max_question_tokens = max_question_tokens
+        self.max_history_tokens = max_history_tokens
+        self.chars_per_token = chars_per_token
+        self._overhead = self.estimate(
+            RYA_PROMPT_TEMPLATE.format(system_prompt=RYA_SYSTEM_PROMPT, context="", user_question="")
+        )
+
+    def estimate(self, text: str) -> int:
+        """Estimate the number of tokens in ``text``."""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        max_chars = int(max_tokens * self.chars_per_token) - len(TRUNCATION_MARK)
+        return text[: max(max_chars, 0)] + TRUNCATION_MARK
+
+    def _truncate_head(self, text: str, max_tokens: int) -> str:
+        """Like ``_truncate``, but keep the end of ``text`` (the newest history)."""
+        max_chars = int(max_tokens * self.chars_per_token) - len(TRUNCATION_MARK)
+        return TRUNCATION_MARK.lstrip() + " " + text[len(text) - max(max_chars, 0):]
+
+    def _shorten(self, name: str, records, max_tokens: int) -> Tuple[str, int]:
+        """
+        Render as many leading records of a section as fit ``max_tokens``.
+
+        Returns the text and the number of records it holds.
+        """
+        header, render_record = LIST_SECTIONS[name]
+        parts = [header]
+        used = self.estimate(header)
+        for record in records:
+            text = render_record(record)
+            used += self.estimate(text)
+            if used > max_tokens:
+                break
+            parts.append(text)
+        return ("".join(parts), len(parts) - 1) if len(parts) > 1 else ("", 0)
+
+    def plan(self, question: str, snapshot: PortfolioSnapshot, history: str = "") -> PromptPlan:
+        """
+        Return the question and context to send for ``snapshot``.
+
+        ``history`` (earlier turns of a conversation) is sent along with the
+        question, keeping its most recent ``max_history_tokens``.
+        """
+        question_truncated = self.estimate(question) > self.max_question_tokens
+        if question_truncated:
+            question = self._truncate(question, self.max_question_tokens)
+            prompt_truncations.inc(part="question")
+
+        if history:
+            if self.estimate(history) > self.max_history_tokens:
+                history = self._truncate_head(history, self.max_history_tokens)
+                prompt_truncations.inc(part="history")
+            question = RYA_FOLLOW_UP_TEMPLATE.format(history=history, question=question)
+
+        return self._fit(question, snapshot, question_truncated)
+
+    def plan_batch(self, questions: List[str], snapshot: PortfolioSnapshot) -> PromptPlan:
+        """
+        Return one prompt asking all ``questions`` against ``snapshot``.
+
+        Each question is held to ``max_question_tokens`` on its own.
+        """
+        numbered = []
+        question_truncated = False
+        for number, question in enumerate(questions, start=1):
+            if self.estimate(question) > self.max_question_tokens:
+                question = self._truncate(question, self.max_question_tokens)
+                question_truncated = True
+                prompt_truncations.inc(part="question")
+            numbered.append(f"{number}. {question}")
+        batch = RYA_BATCH_TEMPLATE.format(count=len(questions), questions="\n".join(numbered))
+        return self._fit(batch, snapshot, question_truncated)
+
+    def _fit(self, question: str, snapshot: PortfolioSnapshot, question_truncated: bool) -> PromptPlan:
+        """Shorten or drop context sections until ``question`` and context fit."""
+        fixed = self._overhead + self.estimate(question)
+        fragments: Dict[str, str] = context_renderer.fragments(snapshot)
+        sizes = {name: self.estimate(text) for name, text in fragments.items()}
+        total = fixed + sum(sizes.values())
+
+        if total <= self.max_tokens:
+            context = context_renderer.render(snapshot)
+            return self._report(PromptPlan(question, context, fixed + self.estimate(context), question_truncated))
+
+        shortened, dropped = [], []
+        kept_records: Dict[str, int] = {}
+        for name in SECTION_DROP_ORDER:
+            if total <= self.max_tokens:
+                break
+            if not fragments[name]:
+                continue
+            allowance = sizes[name] - (total - self.max_tokens)
+            text, kept = self._shorten(name, getattr(snapshot, name), allowance) if allowance > 0 else ("", 0)
+            if text:
+                shortened.append(name)
+                kept_records[name] = kept
+            else:
+                dropped.append(name)
+            prompt_truncations.inc(part=name)
+            total -= sizes[name] - self.estimate(text)
+            fragments[name], sizes[name] = text, self.estimate(text)
+
+        context = join_sections(list(fragments.values()))
+        if fixed + self.estimate(context) > self.max_tokens:
+            context = self._truncate(context, max(self.max_tokens - fixed, 0))
+            prompt_truncations.inc(part="context")
+
+        return self._report(
+            PromptPlan(
+                question,
+                context,
+                fixed + self.estimate(context),
+                question_truncated,
+                tuple(shortened),
+                tuple(dropped),
+                kept_records,
+            )
+        )
+
+    def _report(self, plan: PromptPlan) -> PromptPlan:
+        prompt_tokens_histogram.observe(plan.tokens)
+        if plan.question_truncated or plan.shortened_sections or plan.dropped_sections:
+            logger.info(
+                "Rya prompt trimmed to ~%d tokens (question truncated: %s, shortened: %s, dropped: %s)",
+                plan.tokens,
+                plan.question_truncated,
+                ", ".join(plan.shortened_sections) or "-",
+                ", ".join(plan.dropped_sections) or "-",
+            )
+        return plan
+
+
+# Singleton instance
+prompt_budgeter = PromptBudgeter(
+    max_tokens=settings.RYA_MAX_PROMPT_TOKENS,
+    max_question_tokens=settings.RYA_MAX_QUESTION_TOKENS,
+    max_history_tokens=settings.RYA_MAX_HISTORY_TOKENS,
+)
@@ -0,0 +1,35 @@
+"""
+Queries - Prebuilt statements for the hot read paths of the services.
+
+Statements are built once at import time; per-request values are passed
+as bound parameters. Reusing the same statement object skips building it
+and computing its cache key on every request, and the constant SQL text
+lets the engine's compiled cache and asyncpg's prepared-statement cache
+(DATABASE_PREPARED_STATEMENT_CACHE_SIZE) hit every time.
+"""
+
+from sqlalchemy import bindparam, select
+
+from app.models import Certification, Experience, PersonalInfo, Project, Skill
+
+# Personal info
+PERSONAL_INFO = select(PersonalInfo).limit(1)
+PERSONAL_INFO_BY_ID = select(PersonalInfo).where(PersonalInfo.id == bindparam("id"))
+
+# Skills
+ALL_SKILLS = select(Skill)
+SKILL_BY_ID = select(Skill).where(Skill.id == bindparam("id"))
+SKILLS_BY_CATEGORY = select(Skill).where(Skill.category == bindparam("category"))
+
+# Certifications
+ALL_CERTIFICATIONS = select(Certification)
+CERTIFICATION_BY_ID = select(Certification).where(Certification.id == bindparam("id"))
+
+# Projects
+ALL_PROJECTS = select(Project).order_by(Project.created_at.desc())
+PROJECT_BY_ID = select(Project).where(Project.id == bindparam("id"))
+PROJECTS_BY_TYPE = select(Project).where(Project.project_type == bindparam("project_type"))
+
+# Experience
+ALL_EXPERIENCES = select(Experience).order_by(Experience.start_date.desc())
+EXPERIENCE_BY_ID = select(Experience).where(Experience.id == bindparam("id"))
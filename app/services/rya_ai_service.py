@@ -2,7 +2,12 @@
 Rya AI Service - AI Assistant business logic layer.
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Collection, Dict, Any, FrozenSet, List, Optional
+
+import anyio
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,183 +17,608 @@ from app.models import (
     Certification,
     Project,
     Experience,
-    AIContextLog,
 )
-from app.core.ai_client import get_gemini_client
+from app.core.ai_client import AIClientError, AIProvider, get_ai_provider
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, replica_reads
+from app.core.timing import stage
 from app.prompts.rya_system_prompt import RYA_SYSTEM_PROMPT
+from app.services.analytics_service import ABORTED_MARKER, APOLOGY_PREFIX
+from app.services.answer_cache import answer_cache
+from app.services.context_query import fetch_context
+from app.services.context_retriever import context_retriever
+from app.services.conversation_store import (
+    Conversation,
+    conversation_store,
+    new_session_id,
+)
+from app.services.faq_service import faq_index, load_logged_questions, mine_intents
+from app.services.intent_router import intent_router
+from app.services.interaction_log_writer import (
+    insert_log_rows,
+    interaction_log_writer,
+    make_log_row,
+)
+from app.services.portfolio_snapshot import (
+    ALL_SECTIONS,
+    PortfolioSnapshot,
+    portfolio_snapshot_store,
+)
+from app.services.prompt_budget import PromptPlan, prompt_budgeter
+from app.utils.singleflight import SingleFlight
+from app.utils.text import normalize_question
+
+logger = logging.getLogger(__name__)
+
+# Model calls currently running, keyed by (normalized question, content key)
+inflight_answers = SingleFlight()
+
+
+def _apology(error: Exception) -> str:
+    """Answer returned to the visitor when the model call fails."""
+    return f"{APOLOGY_PREFIX} Error: {str(error)}"
+
+
+def _parse_batch_answers(text: str, count: int) -> Optional[List[str]]:
+    """Extract ``count`` answers from a batch reply, or None if malformed."""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    answers = data.get("answers") if isinstance(data, dict) else None
+    if (
+        not isinstance(answers, list)
+        or len(answers) != count
+        or not all(isinstance(a, str) and a.strip() for a in answers)
+    ):
+        return None
+    return [a.strip() for a in answers]
 
 
 class RyaAIService:
     """Service class for Rya AI assistant operations."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        provider: Optional[AIProvider] = None,
+        client_hash: Optional[str] = None,
+    ):
         self.db = db
-        self.gemini_client = get_gemini_client()
+        self.ai_provider = provider or get_ai_provider()
+        # Logged with every interaction, to count distinct askers per FAQ intent
+        self.client_hash = client_hash
 
-    async def _fetch_portfolio_context(self) -> Dict[str, Any]:
-        """Fetch all relevant portfolio data for AI context."""
+    async def _fetch_portfolio_context(
+        self, sections: Collection[str] = ALL_SECTIONS
+    ) -> Dict[str, Any]:
+        """
+        Fetch the requested portfolio sections for AI context from the
+        database, one ORM query per section.
+        """
         context = {}
 
         # Fetch personal info
-        personal_result = await self.db.execute(select(PersonalInfo).limit(1))
-        personal_info = personal_result.scalar_one_or_none()
-        if personal_info:
-            context["personal_info"] = {
-                "name": personal_info.name,
-                "place": personal_info.place,
-                "country": personal_info.country,
-                "email": personal_info.email,
-                "bio": personal_info.bio,
-            }
+        if "personal_info" in sections:
+            personal_result = await self.db.execute(select(PersonalInfo).limit(1))
+            personal_info = personal_result.scalar_one_or_none()
+            if personal_info:
+                context["personal_info"] = {
+                    "name": personal_info.name,
+                    "place": personal_info.place,
+                    "country": personal_info.country,
+                    "email": personal_info.email,
+                    "bio": personal_info.bio,
+                }
 
         # Fetch skills
-        skills_result = await self.db.execute(select(Skill))
-        skills = skills_result.scalars().all()
-        context["skills"] = [
-            {
-                "name": s.name,
-                "category": s.category,
-                "proficiency_level": s.proficiency_level,
-                "is_hobby": s.is_hobby,
-            }
-            for s in skills
-        ]
+        if "skills" in sections:
+            skills_result = await self.db.execute(select(Skill))
+            skills = skills_result.scalars().all()
+            context["skills"] = [
+                {
+                    "name": s.name,
+                    "category": s.category,
+                    "proficiency_level": s.proficiency_level,
+                    "is_hobby": s.is_hobby,
+                }
+                for s in skills
+            ]
 
         # Fetch certifications
-        certs_result = await self.db.execute(select(Certification))
-        certifications = certs_result.scalars().all()
-        context["certifications"] = [
-            {
-                "title": c.title,
-                "issuer": c.issuer,
-                "issue_date": str(c.issue_date) if c.issue_date else None,
-            }
-            for c in certifications
-        ]
+        if "certifications" in sections:
+            certs_result = await self.db.execute(select(Certification))
+            certifications = certs_result.scalars().all()
+            context["certifications"] = [
+                {
+                    "title": c.title,
+                    "issuer": c.issuer,
+                    "issue_date": str(c.issue_date) if c.issue_date else None,
+                }
+                for c in certifications
+            ]
 
         # Fetch projects
-        projects_result = await self.db.execute(select(Project))
-        projects = projects_result.scalars().all()
-        context["projects"] = [
-            {
-                "title": p.title,
-                "description": p.description,
-                "tech_stack": p.tech_stack,
-                "project_type": p.project_type,
-                "github_url": p.github_url,
-                "live_url": p.live_url,
-            }
-            for p in projects
-        ]
+        if "projects" in sections:
+            projects_result = await self.db.execute(select(Project))
+            projects = projects_result.scalars().all()
+            context["projects"] = [
+                {
+                    "title": p.title,
+                    "description": p.description,
+                    "tech_stack": p.tech_stack,
+                    "project_type": p.project_type,
+                    "github_url": p.github_url,
+                    "live_url": p.live_url,
+                }
+                for p in projects
+            ]
 
         # Fetch experience
-        exp_result = await self.db.execute(select(Experience))
-        experiences = exp_result.scalars().all()
-        context["experience"] = [
-            {
-                "company_name": e.company_name,
-                "role": e.role,
-                "description": e.description,
-                "start_date": str(e.start_date) if e.start_date else None,
-                "end_date": str(e.end_date) if e.end_date else None,
-                "learnings": e.learnings,
-            }
-            for e in experiences
-        ]
+        if "experience" in sections:
+            exp_result = await self.db.execute(select(Experience))
+            experiences = exp_result.scalars().all()
+            context["experience"] = [
+                {
+                    "company_name": e.company_name,
+                    "role": e.role,
+                    "description": e.description,
+                    "start_date": str(e.start_date) if e.start_date else None,
+                    "end_date": str(e.end_date) if e.end_date else None,
+                    "learnings": e.learnings,
+                }
+                for e in experiences
+            ]
 
         return context
 
-    def _format_context_for_prompt(self, context: Dict[str, Any]) -> str:
-        """Format the context dictionary into a readable string for the AI prompt."""
-        formatted_parts = []
-
-        if "personal_info" in context and context["personal_info"]:
-            info = context["personal_info"]
-            formatted_parts.append(f"""
-PERSONAL INFORMATION:
-- Name: {info.get('name', 'N/A')}
-- Location: {info.get('place', 'N/A')}, {info.get('country', 'N/A')}
-- Email: {info.get('email', 'N/A')}
-- Bio: {info.get('bio', 'N/A')}
-""")
-
-        if "skills" in context and context["skills"]:
-            skills_text = "\nSKILLS:\n"
-            for skill in context["skills"]:
-                skills_text += f"- {skill['name']} ({skill['category']}) - Proficiency: {skill.get('proficiency_level', 'N/A')}%"
-                if skill.get('is_hobby'):
-                    skills_text += " [Hobby]"
-                skills_text += "\n"
-            formatted_parts.append(skills_text)
-
-        if "certifications" in context and context["certifications"]:
-            certs_text = "\nCERTIFICATIONS:\n"
-            for cert in context["certifications"]:
-                certs_text += f"- {cert['title']} by {cert['issuer']}"
-                if cert.get('issue_date'):
-                    certs_text += f" (Issued: {cert['issue_date']})"
-                certs_text += "\n"
-            formatted_parts.append(certs_text)
-
-        if "projects" in context and context["projects"]:
-            projects_text = "\nPROJECTS:\n"
-            for project in context["projects"]:
-                projects_text += f"- {project['title']} ({project['project_type']})\n"
-                projects_text += f"  Description: {project.get('description', 'N/A')}\n"
-                if project.get('tech_stack'):
-                    projects_text += f"  Technologies: {', '.join(project['tech_stack'])}\n"
-            formatted_parts.append(projects_text)
-
-        if "experience" in context and context["experience"]:
-            exp_text = "\nWORK EXPERIENCE:\n"
-            for exp in context["experience"]:
-                exp_text += f"- {exp['role']} at {exp['company_name']}\n"
-                if exp.get('start_date'):
-                    end = exp.get('end_date', 'Present')
-                    exp_text += f"  Duration: {exp['start_date']} - {end}\n"
-                if exp.get('description'):
-                    exp_text += f"  Description: {exp['description']}\n"
-                if exp.get('learnings'):
-                    exp_text += f"  Key Learnings: {exp['learnings']}\n"
-            formatted_parts.append(exp_text)
-
-        return "\n".join(formatted_parts) if formatted_parts else "No portfolio data available."
-
-    async def ask_rya(self, question: str) -> str:
+    async def _get_portfolio_snapshot(
+        self, sections: Collection[str] = ALL_SECTIONS
+    ) -> PortfolioSnapshot:
+        """
+        Return the in-memory snapshot of the given portfolio sections.
+
+        The database is only read for sections whose data changed since they
+        were loaded (or expired), in a single statement unless
+        ``RYA_CONTEXT_SINGLE_QUERY`` is off, and may be served by a read
+        replica. The read is a transaction of its own: it ends before
+        returning, so the session's pooled connection is not held while the
+        model is generating.
+        """
+        async def load(names: Collection[str]) -> Dict[str, Any]:
+            with stage("db"), replica_reads(self.db):
+                if settings.RYA_CONTEXT_SINGLE_QUERY:
+                    context = await fetch_context(self.db, names)
+                else:
+                    context = await self._fetch_portfolio_context(names)
+                await self.db.commit()
+                return context
+
+        with stage("context"):
+            return await portfolio_snapshot_store.get(load, sections)
+
+    @staticmethod
+    def _follow_up_query(
+        question: str, history: str = "", conversation: Optional[Conversation] = None
+    ) -> str:
+        """
+        Text to route and retrieve on: the question, plus the last turn for
+        follow-ups ("and which of those used Flutter?").
+        """
+        if history:
+            return f"{question} {conversation.retrieval_hint()}"
+        return question
+
+    def _route(
+        self, question: str, history: str = "", conversation: Optional[Conversation] = None
+    ) -> FrozenSet[str]:
+        """Sections needed for the question; follow-ups also route on the last turn."""
+        query = self._follow_up_query(question, history, conversation)
+        with stage("route"):
+            return intent_router.route(query).sections
+
+    def _select_context(self, snapshot: PortfolioSnapshot, question: str) -> PortfolioSnapshot:
+        """
+        Narrow the snapshot to the records relevant to the question.
+
+        With ``RYA_RETRIEVAL_ENABLED`` off, the whole portfolio is used.
+        """
+        if not settings.RYA_RETRIEVAL_ENABLED:
+            return snapshot
+        return context_retriever.select(snapshot, question)
+
+    async def _complete(self, plan: PromptPlan) -> str:
+        """Ask the model to answer a planned prompt."""
+        return await self.ai_provider.generate_response(
+            user_question=plan.question,
+            context=plan.context,
+            system_prompt=RYA_SYSTEM_PROMPT,
+        )
+
+    async def _generate_answer(self, plan: PromptPlan, cache_key: str, content_key: str) -> str:
+        """Ask the model and cache the answer for this portfolio content."""
+        response = await self._complete(plan)
+        answer_cache.put(cache_key, content_key, response)
+        return response
+
+    def _instant_answer(self, question: str, cache_key: str, snapshot: PortfolioSnapshot) -> Optional[str]:
+        """
+        Return a cached or precomputed FAQ answer, without calling the model.
+
+        ``snapshot`` must not be narrowed by retrieval. Seeing a snapshot the
+        FAQ answers were not computed for starts regenerating them.
+        """
+        answer = answer_cache.get(cache_key, snapshot.content_key)
+        if answer is None and settings.RYA_FAQ_ENABLED:
+            faq_index.ensure_fresh(snapshot, self._faq_answer, load_full_snapshot)
+            answer = faq_index.lookup(question, snapshot)
+        return answer
+
+    async def _faq_answer(self, question: str, snapshot: PortfolioSnapshot) -> str:
+        """Answer a frequent question for the FAQ index (no database access)."""
+        plan = prompt_budgeter.plan(question, self._select_context(snapshot, question))
+        return await self._complete(plan)
+
+    async def open_session(
+        self, session_id: Optional[str] = None, start: bool = False
+    ) -> Optional[Conversation]:
+        """
+        Return the conversation for ``session_id``.
+
+        Unknown or expired sessions start a new conversation under a fresh
+        id, as does ``start`` without a ``session_id``. One-off questions
+        (neither) get no conversation, so they are never stored and cannot
+        evict real multi-turn sessions.
+        """
+        if session_id:
+            conversation = await conversation_store.get(session_id)
+            return conversation or Conversation(new_session_id())
+        return Conversation(new_session_id()) if start else None
+
+    def _question_context(
+        self, snapshot: PortfolioSnapshot, question: str, history: str, conversation: Optional[Conversation]
+    ) -> PortfolioSnapshot:
+        """Select context for the question; follow-ups also match the last turn."""
+        return self._select_context(
+            snapshot, self._follow_up_query(question, history, conversation)
+        )
+
+    async def ask_rya(self, question: str, conversation: Optional[Conversation] = None) -> str:
         """
         Ask Rya a question about the portfolio.
         
         Args:
             question: The user's question
+            conversation: Session the question belongs to; earlier turns are
+                sent along and the new turn is recorded
             
         Returns:
             AI-generated response
         """
-        # Fetch portfolio context
-        context = await self._fetch_portfolio_context()
-        formatted_context = self._format_context_for_prompt(context)
+        history = conversation.render() if conversation else ""
 
-        # Generate AI response
-        response = await self.gemini_client.generate_response(
-            user_question=question,
-            context=formatted_context,
-            system_prompt=RYA_SYSTEM_PROMPT,
+        # Fetch the portfolio sections the question is about
+        full_snapshot = await self._get_portfolio_snapshot(
+            self._route(question, history, conversation)
         )
+        with stage("select"):
+            snapshot = self._question_context(full_snapshot, question, history, conversation)
+
+        # Reuse a recent or precomputed answer to the same question on the
+        # same data; answers to follow-ups depend on the conversation and are
+        # never shared
+        cache_key = normalize_question(question)
+        with stage("cache"):
+            response = None if history else self._instant_answer(question, cache_key, full_snapshot)
+        plan = None
+        answered = True
+
+        if response is None:
+            # Fit question, history and context into the prompt token budget
+            with stage("prompt"):
+                plan = prompt_budgeter.plan(question, snapshot, history)
+
+            # Generate AI response; identical first questions asked
+            # concurrently against the same data share a single model call
+            try:
+                with stage("model"):
+                    if history:
+                        response = await self._complete(plan)
+                    else:
+                        content_key = full_snapshot.content_key
+                        response = await inflight_answers.do(
+                            (cache_key, content_key),
+                            lambda: self._generate_answer(plan, cache_key, content_key),
+                        )
+            except AIClientError as e:
+                # Model unavailable: fall back to the last good answer
+                response = answer_cache.last_good(cache_key)
+                if response is None:
+                    response = _apology(e)
+                    answered = False
 
-        # Log the interaction
-        await self._log_interaction(question, response, context)
+        if conversation is not None and answered:
+            await conversation_store.append(conversation.session_id, question, response)
+
+        # Log the interaction with the context actually sent to the model
+        with stage("log"):
+            if plan is None:
+                await self._log_interaction(question, response, snapshot.to_context())
+            else:
+                await self._log_interaction(question, response, plan.used_context(snapshot), plan.tokens)
 
         return response
 
+    async def _answer_single(self, plan: PromptPlan, cache_key: str, snapshot: PortfolioSnapshot) -> str:
+        """Answer one planned question on its own, sharing concurrent identical calls."""
+        return await inflight_answers.do(
+            (cache_key, snapshot.content_key),
+            lambda: self._generate_answer(plan, cache_key, snapshot.content_key),
+        )
+
+    async def ask_rya_batch(self, questions: List[str]) -> List[Dict[str, Optional[str]]]:
+        """
+        Answer several questions with one database read, covering the
+        sections any of them needs.
+
+        Each question gets the context ``ask_rya`` would give it (its own
+        routed sections, narrowed by retrieval), and its answers are cached
+        and shared under that question's own snapshot, so batch and single
+        questions reuse each other's answers. Cached answers are reused and
+        repeated questions asked once; the rest go to the model in a single
+        call over the merged contexts that returns one answer per question.
+        If that reply cannot be parsed, the questions are answered
+        individually (concurrently). Every question is logged on its own,
+        with the context and prompt tokens of the model calls made for it:
+        none for reused answers, and an equal share of a batch call.
+
+        Args:
+            questions: The user's questions
+
+        Returns:
+            One ``{"question", "answer", "error"}`` dict per question, in order
+        """
+        keys = [normalize_question(q) for q in questions]
+        unique: Dict[str, str] = {}
+        for question, key in zip(questions, keys):
+            unique.setdefault(key, question)
+        routes = {key: self._route(question) for key, question in unique.items()}
+
+        # One read loads every section; each question's own snapshot is then
+        # assembled from the cached sections
+        snapshot = await self._get_portfolio_snapshot(frozenset().union(*routes.values()))
+        own: Dict[str, PortfolioSnapshot] = {}
+        for key, sections in routes.items():
+            own[key] = await self._get_portfolio_snapshot(sections)
+        with stage("select"):
+            selected = {
+                key: self._select_context(own[key], question) for key, question in unique.items()
+            }
+
+        answers: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        pending: Dict[str, str] = {}
+        for key, question in unique.items():
+            with stage("cache"):
+                cached = self._instant_answer(question, key, own[key])
+            if cached is not None:
+                answers[key] = cached
+            else:
+                pending[key] = question
+
+        # Per question: context sent to the model and estimated prompt tokens
+        sent: Dict[str, Dict[str, Any]] = {}
+        prompt_tokens: Dict[str, int] = {}
+        if len(pending) > 1:
+            with stage("prompt"):
+                batch_snapshot = snapshot.merge([selected[key] for key in pending])
+                plan = prompt_budgeter.plan_batch(list(pending.values()), batch_snapshot)
+            batch_context = plan.used_context(batch_snapshot)
+            share = -(-plan.tokens // len(pending))
+            for key in pending:
+                sent[key] = batch_context
+                prompt_tokens[key] = share
+            try:
+                with stage("model"):
+                    reply = await self._complete(plan)
+                parsed = _parse_batch_answers(reply, len(pending))
+            except AIClientError as e:
+                errors.update((key, str(e)) for key in pending)
+                pending = {}
+            else:
+                if parsed is not None:
+                    for key, answer in zip(pending, parsed):
+                        answers[key] = answer
+                        answer_cache.put(key, own[key].content_key, answer)
+                    pending = {}
+                else:
+                    logger.warning(
+                        "Unparseable batch answer for %d questions; answering individually",
+                        len(pending),
+                    )
+
+        if pending:
+            with stage("prompt"):
+                plans = {
+                    key: prompt_budgeter.plan(q, selected[key]) for key, q in pending.items()
+                }
+            for key, plan in plans.items():
+                sent[key] = plan.used_context(selected[key])
+                prompt_tokens[key] = prompt_tokens.get(key, 0) + plan.tokens
+            with stage("model"):
+                results = await asyncio.gather(
+                    *(self._answer_single(plan, key, own[key]) for key, plan in plans.items()),
+                    return_exceptions=True,
+                )
+            for key, result in zip(pending, results):
+                if isinstance(result, AIClientError):
+                    errors[key] = str(result)
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    answers[key] = result
+
+        # Model unavailable: fall back to the last good answers
+        for key in list(errors):
+            stale = answer_cache.last_good(key)
+            if stale is not None:
+                answers[key] = stale
+                del errors[key]
+
+        items = []
+        for question, key in zip(questions, keys):
+            answer, error = answers.get(key), errors.get(key)
+            items.append({"question": question, "answer": answer, "error": error})
+            logged = answer if answer is not None else _apology(AIClientError(error))
+            # Repeats of a question reuse its answer without a model call
+            used_context = sent.pop(key, None)
+            tokens = prompt_tokens.pop(key, None)
+            if used_context is None:
+                used_context = selected[key].to_context()
+            with stage("log"):
+                await self._log_interaction(question, logged, used_context, tokens)
+        return items
+
+    async def stream_rya(
+        self, question: str, conversation: Optional[Conversation] = None
+    ) -> AsyncIterator[str]:
+        """
+        Ask Rya a question and stream the answer as it is generated.
+
+        The portfolio snapshot is read eagerly on this service's session; the
+        returned iterator only talks to the model, so it may outlive the
+        request-scoped session. The interaction is logged in its own session
+        once the stream finishes, fails or is aborted.
+
+        Args:
+            question: The user's question
+            conversation: Session the question belongs to
+
+        Returns:
+            Async iterator of answer text fragments
+        """
+        history = conversation.render() if conversation else ""
+        snapshot = await self._get_portfolio_snapshot(
+            self._route(question, history, conversation)
+        )
+        return self._stream_answer(question, snapshot, conversation)
+
+    async def _stream_answer(
+        self,
+        question: str,
+        snapshot: PortfolioSnapshot,
+        conversation: Optional[Conversation] = None,
+    ) -> AsyncIterator[str]:
+        """Relay model output and log whatever was produced when done."""
+        history = conversation.render() if conversation else ""
+        full_snapshot = snapshot
+        with stage("select"):
+            snapshot = self._question_context(full_snapshot, question, history, conversation)
+        cache_key = normalize_question(question)
+        fragments = []
+        completed = False
+        plan = None
+        try:
+            with stage("cache"):
+                cached = None if history else self._instant_answer(question, cache_key, full_snapshot)
+            answered = True
+            if cached is not None:
+                fragments.append(cached)
+                yield cached
+            else:
+                with stage("prompt"):
+                    plan = prompt_budgeter.plan(question, snapshot, history)
+                try:
+                    async for fragment in self.ai_provider.stream_response(
+                        user_question=plan.question,
+                        context=plan.context,
+                        system_prompt=RYA_SYSTEM_PROMPT,
+                    ):
+                        fragments.append(fragment)
+                        yield fragment
+                    if not history:
+                        answer_cache.put(cache_key, full_snapshot.content_key, "".join(fragments))
+                except AIClientError as e:
+                    stale = None if fragments else answer_cache.last_good(cache_key)
+                    if stale is not None:
+                        fragments.append(stale)
+                        yield stale
+                    else:
+                        apology = _apology(e)
+                        fragments.append(apology)
+                        answered = False
+                        yield apology
+            if conversation is not None and answered:
+                await conversation_store.append(
+                    conversation.session_id, question, "".join(fragments)
+                )
+            completed = True
+        finally:
+            response = "".join(fragments)
+            if not completed:
+                response += f"\n{ABORTED_MARKER}"
+            if plan is None:
+                context, prompt_tokens = snapshot.to_context(), None
+            else:
+                context, prompt_tokens = plan.used_context(snapshot), plan.tokens
+            # The stream may be unwinding from a cancelled scope (client
+            # disconnect); shield the log write so it still happens.
+            with anyio.CancelScope(shield=True):
+                try:
+                    async with AsyncSessionLocal() as session:
+                        await RyaAIService(session, client_hash=self.client_hash)._log_interaction(
+                            question, response, context, prompt_tokens
+                        )
+                except Exception:
+                    logger.exception("Failed to log streamed Rya interaction")
+
     async def _log_interaction(
-        self, question: str, response: str, context: Dict[str, Any]
-    ) -> AIContextLog:
-        """Log the AI interaction to the database."""
-        log = AIContextLog(
-            user_question=question,
-            ai_response=response,
-            used_context=context,
+        self,
+        question: str,
+        response: str,
+        context: Dict[str, Any],
+        prompt_tokens: Optional[int] = None,
+    ) -> None:
+        """
+        Log the AI interaction to the database.
+
+        While the background log writer is running the row is only queued;
+        otherwise (e.g. scripts without the app lifespan) it is inserted on
+        this service's session in a short transaction of its own.
+        """
+        if interaction_log_writer.running:
+            await interaction_log_writer.submit(
+                question, response, context, prompt_tokens, self.client_hash
+            )
+            return
+
+        await insert_log_rows(
+            self.db, [make_log_row(question, response, context, prompt_tokens, self.client_hash)]
+        )
+        await self.db.commit()
+
+
+async def load_full_snapshot() -> PortfolioSnapshot:
+    """Return the snapshot of every portfolio section, on a session of its own."""
+    async with AsyncSessionLocal() as session:
+        return await RyaAIService(session)._get_portfolio_snapshot()
+
+
+async def refresh_faq() -> None:
+    """Mine frequent intents from the interaction logs and precompute answers."""
+    async with AsyncSessionLocal() as session:
+        questions = await load_logged_questions(session, faq_index.log_window)
+        service = RyaAIService(session)
+        snapshot = await service._get_portfolio_snapshot()
+    faq_index.set_intents(
+        mine_intents(
+            questions,
+            top_n=faq_index.top_n,
+            min_clients=faq_index.min_clients,
+            cluster_similarity=faq_index.cluster_similarity,
         )
-        self.db.add(log)
-        await self.db.flush()
-        return log
+    )
+    faq_index.ensure_fresh(snapshot, service._faq_answer, load_full_snapshot)
@@ -4,10 +4,11 @@ Skills Service - Business logic layer.
 
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Skill
+from app.services.portfolio_snapshot import portfolio_snapshot_store
+from app.services.queries import ALL_SKILLS, SKILL_BY_ID, SKILLS_BY_CATEGORY
 from app.schemas import SkillCreate, SkillUpdate
 
 
@@ -19,19 +20,17 @@ class SkillService:
 
     async def get_all_skills(self) -> List[Skill]:
         """Get all skills."""
-        result = await self.db.execute(select(Skill))
+        result = await self.db.execute(ALL_SKILLS)
         return list(result.scalars().all())
 
     async def get_skill_by_id(self, skill_id: UUID) -> Optional[Skill]:
         """Get a skill by ID."""
-        result = await self.db.execute(select(Skill).where(Skill.id == skill_id))
+        result = await self.db.execute(SKILL_BY_ID, {"id": skill_id})
         return result.scalar_one_or_none()
 
     async def get_skills_by_category(self, category: str) -> List[Skill]:
         """Get skills by category."""
-        result = await self.db.execute(
-            select(Skill).where(Skill.category == category)
-        )
+        result = await self.db.execute(SKILLS_BY_CATEGORY, {"category": category})
         return list(result.scalars().all())
 
     async def create_skill(self, data: SkillCreate) -> Skill:
@@ -40,11 +39,12 @@ class SkillService:
         self.db.add(skill)
         await self.db.flush()
         await self.db.refresh(skill)
+        portfolio_snapshot_store.invalidate(self.db)
         return skill
 
     async def update_skill(self, skill_id: UUID, data: SkillUpdate) -> Optional[Skill]:
         """Update a skill."""
-        result = await self.db.execute(select(Skill).where(Skill.id == skill_id))
+        result = await self.db.execute(SKILL_BY_ID, {"id": skill_id})
         skill = result.scalar_one_or_none()
 
         if skill:
@@ -53,15 +53,17 @@ class SkillService:
                 setattr(skill, field, value)
             await self.db.flush()
             await self.db.refresh(skill)
+            portfolio_snapshot_store.invalidate(self.db)
 
         return skill
 
     async def delete_skill(self, skill_id: UUID) -> bool:
         """Delete a skill."""
-        result = await self.db.execute(select(Skill).where(Skill.id == skill_id))
+        result = await self.db.execute(SKILL_BY_ID, {"id": skill_id})
         skill = result.scalar_one_or_none()
 
         if skill:
             await self.db.delete(skill)
+            portfolio_snapshot_store.invalidate(self.db)
             return True
         return False
@@ -0,0 +1,45 @@
+"""
+Helpers for abandoning work when the HTTP client goes away.
+"""
+
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client disconnects before the work completes."""
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the ASGI server reports that the client has disconnected."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    Await ``awaitable``, cancelling it if the client disconnects first.
+
+    Must be called after the request body has been read (FastAPI does this
+    before the handler runs), otherwise body messages would be consumed here.
+
+    Raises:
+        ClientDisconnected: If the client went away before completion
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if work.done():
+            return work.result()
+        raise ClientDisconnected()
+    finally:
+        for task in (work, watcher):
+            if not task.done():
+                task.cancel()
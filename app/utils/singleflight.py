@@ -0,0 +1,66 @@
+"""
+Single-flight execution: concurrent callers with the same key share one call.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """One in-flight call and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller starts ``fn()``; callers arriving while it runs await the
+    same task and receive its result or exception. A caller being cancelled
+    does not cancel the shared call unless it was the last one waiting.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _forget(self, key: Hashable, call: _Call, _task: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn()`` for ``key``, or join the call already running for it."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call, task))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Forget the call now, not when the task finishes unwinding,
+                # so a caller arriving meanwhile starts a fresh call instead
+                # of joining the cancelled one
+                self._forget(key, call, call.task)
+                call.task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Return in-flight, started and coalesced call counts."""
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,52 @@
+"""
+Text helpers shared by Rya's question matching and retrieval.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# Words that do not change what a visitor is asking about
+STOP_WORDS = frozenset(
+    """
+    a an the and or but of to in on at for with about from by as is are was were
+    be been being am do does did have has had can could would should will shall
+    may might must i me my we our you your he him his she her they them their it
+    its this that these those what which who whom whose how please tell show
+    give list any some all there here so just also very really
+    """.split()
+)
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def words(text: str) -> List[str]:
+    """Split text into lowercase words, ignoring punctuation."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD.sub(" ", text).split()
+
+
+def normalize_question(question: str) -> str:
+    """
+    Reduce a question to a canonical form for cache lookups.
+
+    Case, punctuation, whitespace and stop words are ignored, so
+    "What technologies do they use?" and "what technologies they use"
+    share one entry. Questions made only of stop words keep all their words.
+    """
+    all_words = words(question)
+    content_words = [w for w in all_words if w not in STOP_WORDS]
+    return " ".join(content_words or all_words)
+
+
+def index_terms(text: str) -> List[str]:
+    """
+    Return the search terms of ``text``: content words, lightly stemmed.
+
+    A trailing plural "s" is dropped so "projects" matches "project".
+    """
+    return [
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in words(text)
+        if w not in STOP_WORDS
+    ]
@@ -2,16 +2,58 @@
 Rya AI API Router - Version 1
 """
 
-from fastapi import APIRouter, Depends, status
+import json
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
 from app.core.database import get_db
-from app.schemas import RyaQuestionRequest, RyaAnswerResponse
-from app.services import RyaAIService
+from app.core.rate_limit import charge, client_digest, rya_rate_limiter
+from app.schemas import (
+    RyaQuestionRequest,
+    RyaAnswerResponse,
+    RyaBatchQuestionRequest,
+    RyaBatchAnswerResponse,
+    RyaAnalyticsResponse,
+)
+from app.services import AnalyticsService, RyaAIService
+from app.services.conversation_store import conversation_store
+from app.utils.disconnect import ClientDisconnected, run_until_disconnect
 
 router = APIRouter()
 
 
+def _sse(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+async def _sse_stream(
+    fragments: AsyncIterator[str], session_id: Optional[str]
+) -> AsyncGenerator[str, None]:
+    """
+    Wrap answer fragments as SSE ``data`` messages followed by ``done``.
+
+    ``fragments`` is closed as soon as this stream is, so the model slot is
+    released and the partial answer logged right away rather than whenever
+    the generators are garbage collected.
+    """
+    async with aclosing(fragments):
+        async for fragment in fragments:
+            yield _sse({"delta": fragment})
+    yield _sse({"session_id": session_id}, event="done")
+
+
+async def _close_stream(stream: AsyncGenerator[str, None]) -> None:
+    """Close a response stream; ``BackgroundTask`` cannot await ``aclose`` directly."""
+    await stream.aclose()
+
+
 @router.post(
     "/ask",
     response_model=RyaAnswerResponse,
@@ -24,7 +66,8 @@ router = APIRouter()
             "content": {
                 "application/json": {
                     "example": {
-                        "answer": "Based on the portfolio, they specialize in Python, FastAPI, Flutter, and have extensive experience with PostgreSQL and cloud technologies."
+                        "answer": "Based on the portfolio, they specialize in Python, FastAPI, Flutter, and have extensive experience with PostgreSQL and cloud technologies.",
+                        "session_id": "Zx8Q0m3pWcH2x1tq9dYb6g",
                     }
                 }
             },
@@ -33,6 +76,7 @@ router = APIRouter()
 )
 async def ask_rya(
     request: RyaQuestionRequest,
+    raw_request: Request,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -53,7 +97,170 @@ async def ask_rya(
     - "Tell me about their work experience"
     - "What projects have they worked on?"
     - "What certifications do they have?"
+    
+    Set `start_session` to start a conversation, then send the returned
+    `session_id` with follow-up questions ("tell me more about that
+    project") to continue it. One-off questions get no `session_id`.
+    
+    If the client disconnects while the answer is being generated, the model
+    call is cancelled instead of running to completion for nobody.
+    """
+    service = RyaAIService(db, client_hash=client_digest(raw_request.scope))
+    conversation = await service.open_session(request.session_id, request.start_session)
+    try:
+        answer = await run_until_disconnect(
+            raw_request, service.ask_rya(request.question, conversation)
+        )
+    except ClientDisconnected:
+        # 499 mirrors nginx's "client closed request"; nobody reads it.
+        return Response(status_code=499)
+    return RyaAnswerResponse(
+        answer=answer, session_id=conversation.session_id if conversation else None
+    )
+
+
+@router.post(
+    "/ask/batch",
+    response_model=RyaBatchAnswerResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Ask Rya AI several questions",
+    description="Ask Rya several questions at once; answers are returned in the same order.",
+    responses={
+        200: {
+            "description": "One answer or error per question",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "answers": [
+                            {
+                                "question": "What technologies do they use?",
+                                "answer": "Based on the portfolio, they specialize in Python and FastAPI.",
+                                "error": None,
+                            },
+                            {
+                                "question": "What projects have they built?",
+                                "answer": None,
+                                "error": "No response from the model within 30 seconds",
+                            },
+                        ]
+                    }
+                }
+            },
+        },
+    },
+)
+async def ask_rya_batch(
+    request: RyaBatchQuestionRequest,
+    raw_request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ask Rya several questions at once.
+    
+    The portfolio context is built once and the questions are answered
+    together in as few model calls as possible. Each item carries either an
+    `answer` or an `error`; every question is logged individually.
+
+    Each question counts against the caller's rate limit.
+    """
+    charge(raw_request.scope, rya_rate_limiter, len(request.questions) - 1)
+    service = RyaAIService(db, client_hash=client_digest(raw_request.scope))
+    try:
+        items = await run_until_disconnect(
+            raw_request, service.ask_rya_batch(request.questions)
+        )
+    except ClientDisconnected:
+        return Response(status_code=499)
+    return RyaBatchAnswerResponse(answers=items)
+
+
+@router.post(
+    "/ask/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Ask Rya AI (streaming)",
+    description="Ask Rya a question and receive the answer as Server-Sent Events while it is generated.",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "Answer fragments streamed as they are generated",
+            "content": {
+                "text/event-stream": {
+                    "example": 'data: {"delta": "Based on the portfolio, "}\n\n'
+                    'data: {"delta": "they specialize in Python."}\n\n'
+                    'event: done\ndata: {"session_id": "Zx8Q0m3pWcH2x1tq9dYb6g"}\n\n'
+                }
+            },
+        },
+    },
+)
+async def ask_rya_stream(
+    request: RyaQuestionRequest,
+    raw_request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ask Rya a question and stream the answer.
+    
+    Each `data` message carries a JSON object with a `delta` text fragment;
+    a final `done` event carries the conversation's `session_id` (null for
+    one-off questions, see `/ask`). Closing the
+    connection cancels the model call, and the (possibly partial) answer is
+    still logged.
+    """
+    service = RyaAIService(db, client_hash=client_digest(raw_request.scope))
+    conversation = await service.open_session(request.session_id, request.start_session)
+    fragments = await service.stream_rya(request.question, conversation)
+    session_id = conversation.session_id if conversation else None
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if session_id:
+        headers["X-Rya-Session-Id"] = session_id
+    stream = _sse_stream(fragments, session_id)
+    # A disconnect during a send leaves the stream suspended; close it then
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers=headers,
+        background=BackgroundTask(_close_stream, stream),
+    )
+
+
+@router.delete(
+    "/sessions/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="End a Rya conversation",
+    description="Forget the history of a conversation session.",
+    responses={
+        404: {"description": "Session not found"},
+    },
+)
+async def end_rya_session(session_id: str):
+    """End a conversation; later questions with this id start a new one."""
+    if not await conversation_store.delete(session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get(
+    "/analytics",
+    response_model=RyaAnalyticsResponse,
+    summary="Rya usage analytics",
+    description="Daily question volume, answer lengths and error rates, plus the most asked questions.",
+    responses={
+        200: {"description": "Analytics retrieved successfully"},
+    },
+)
+async def get_rya_analytics(
+    days: int = Query(30, ge=1, le=366, description="Number of UTC days to report, today included."),
+    top: int = Query(10, ge=1, le=100, description="Number of top questions to return."),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get Rya usage per day, oldest first, with days without questions
+    reported as zeros. Served from daily rollups kept up to date as
+    interactions are logged.
     """
-    service = RyaAIService(db)
-    answer = await service.ask_rya(request.question)
-    return RyaAnswerResponse(answer=answer)
+    service = AnalyticsService(db)
+    return await service.get_summary(days, top)
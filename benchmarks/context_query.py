@@ -0,0 +1,135 @@
+"""
+Compare the two ways of loading the Rya portfolio context: one ORM query per
+section versus the single JSON-aggregating statement.
+
+A synthetic portfolio is inserted inside a transaction that is rolled back
+at the end, so the database is left untouched. Point DATABASE_URL at a
+migrated database and run from the repository root:
+
+    PYTHONPATH=. python benchmarks/context_query.py --records 2000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models import Certification, Experience, PersonalInfo, Project, Skill
+from app.services.context_query import fetch_context
+from app.services.portfolio_snapshot import SECTIONS
+from app.services.rya_ai_service import RyaAIService
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def seed(session, records: int) -> None:
+    """Insert ``records`` rows into every list section (and a profile if missing)."""
+    if not (await session.execute(select(func.count()).select_from(PersonalInfo))).scalar_one():
+        await session.execute(
+            insert(PersonalInfo),
+            [{"name": "Bench Mark", "email": "bench@example.com", "bio": "Synthetic profile " * 20}],
+        )
+    start = datetime(2015, 1, 1)
+    await session.execute(
+        insert(Skill),
+        [
+            {"name": f"Skill {i}", "category": "backend", "proficiency_level": i % 5 + 1, "is_hobby": i % 7 == 0}
+            for i in range(records)
+        ],
+    )
+    await session.execute(
+        insert(Certification),
+        [
+            {"title": f"Certification {i}", "issuer": "Issuer", "issue_date": start + timedelta(days=i)}
+            for i in range(records)
+        ],
+    )
+    await session.execute(
+        insert(Project),
+        [
+            {
+                "title": f"Project {i}",
+                "description": "A synthetic project description. " * 10,
+                "tech_stack": ["Python", "FastAPI", "PostgreSQL"],
+                "project_type": "personal",
+            }
+            for i in range(records)
+        ],
+    )
+    await session.execute(
+        insert(Experience),
+        [
+            {
+                "company_name": f"Company {i}",
+                "role": "Engineer",
+                "description": "Synthetic experience. " * 10,
+                "start_date": start + timedelta(days=i),
+                "learnings": "Things learned. " * 5,
+            }
+            for i in range(records)
+        ],
+    )
+
+
+def canonical(context: dict) -> str:
+    """Order-insensitive form of a context, to check both paths agree."""
+    return json.dumps(
+        {k: sorted(json.dumps(r, sort_keys=True) for r in v) if isinstance(v, list) else v
+         for k, v in context.items()},
+        sort_keys=True,
+    )
+
+
+async def timed(label: str, load: Callable[[], Awaitable[dict]], iterations: int) -> None:
+    await load()  # warm up
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await load()
+        durations.append(time.perf_counter() - started)
+    print(
+        f"{label:8} mean={statistics.mean(durations) * 1000:.1f}ms "
+        f"p50={percentile(durations, 50) * 1000:.1f}ms "
+        f"p95={percentile(durations, 95) * 1000:.1f}ms "
+        f"max={max(durations) * 1000:.1f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000, help="synthetic rows per list section")
+    parser.add_argument("--iterations", type=int, default=30, help="timed loads per path")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        await seed(session, args.records)
+        service = RyaAIService(session)
+
+        orm = await service._fetch_portfolio_context(SECTIONS)
+        single = await fetch_context(session, SECTIONS)
+        same = canonical(orm) == canonical(single)
+        print(f"records per section: {args.records}, identical context: {same}")
+
+        async def load_orm() -> dict:
+            # A request starts with an empty identity map
+            session.expunge_all()
+            return await service._fetch_portfolio_context(SECTIONS)
+
+        await timed("orm", load_orm, args.iterations)
+        await timed("single", lambda: fetch_context(session, SECTIONS), args.iterations)
+        await session.rollback()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Measure the per-request cost of the session modes ``get_db`` can give GET
+requests (DATABASE_READ_SESSION_MODE): a committed transaction ("off"), a
+BEGIN READ ONLY transaction ("read_only") and autocommit ("autocommit").
+
+Each simulated request goes through ``get_db`` exactly like a GET handler:
+open the session, run one query, finish the dependency. Point DATABASE_URL
+at a migrated database and run from the repository root:
+
+    PYTHONPATH=. python benchmarks/read_session.py --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from typing import List
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import engine, get_db
+from app.models import Skill
+
+MODES = ("off", "read_only", "autocommit")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def request() -> None:
+    """One GET request's worth of database work."""
+    dependency = get_db(SimpleNamespace(method="GET"))
+    session = await dependency.__anext__()
+    (await session.execute(select(Skill))).scalars().all()
+    try:
+        await dependency.__anext__()
+    except StopAsyncIteration:
+        pass
+
+
+async def run(mode: str, requests: int, concurrency: int) -> None:
+    settings.DATABASE_READ_SESSION_MODE = mode
+    for _ in range(concurrency):
+        await request()  # warm up the pool
+
+    durations: List[float] = []
+    remaining = [requests]
+
+    async def worker() -> None:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            await request()
+            durations.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{mode:10} {len(durations) / elapsed:7.0f} req/s "
+        f"mean={statistics.mean(durations) * 1000:.2f}ms "
+        f"p50={percentile(durations, 50) * 1000:.2f}ms "
+        f"p95={percentile(durations, 95) * 1000:.2f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="simulated requests per mode")
+    parser.add_argument("--concurrency", type=int, default=4, help="parallel requests (at most the pool size)")
+    args = parser.parse_args()
+
+    for mode in MODES:
+        await run(mode, args.requests, args.concurrency)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Load and soak test for the Rya endpoints.
+
+Start the API with the local model so no network access or quota is needed:
+
+    AI_PROVIDER=fake FAKE_AI_LATENCY_MS=500 uvicorn app.main:app
+
+then run, for example:
+
+    python benchmarks/rya_load.py --requests 500 --concurrency 20
+    python benchmarks/rya_load.py --duration 600 --concurrency 10 --stream
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+
+QUESTIONS = [
+    "What programming languages do you know?",
+    "Tell me about your recent projects.",
+    "Where have you worked before?",
+    "What certifications do you have?",
+    "How can I contact you?",
+    "What is your experience with Python?",
+    "Which frameworks have you used for backend work?",
+    "What did you learn at your last job?",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def ask(client: httpx.AsyncClient, path: str, question: str):
+    """Send one question; return (status, total seconds, first-byte seconds)."""
+    started = time.perf_counter()
+    first_byte = None
+    async with client.stream("POST", path, json={"question": question}) as response:
+        async for _ in response.aiter_raw():
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+    return response.status_code, time.perf_counter() - started, first_byte
+
+
+async def worker(client, args, path, deadline, counter, results):
+    while True:
+        if args.duration:
+            if time.perf_counter() >= deadline:
+                return
+        else:
+            if counter[0] >= args.requests:
+                return
+            counter[0] += 1
+        question = random.choice(QUESTIONS)
+        if args.unique:
+            question = f"{question} (#{random.randrange(10 ** 9)})"
+        started = time.perf_counter()
+        try:
+            results.append(await ask(client, path, question))
+        except httpx.HTTPError as e:
+            results.append((type(e).__name__, time.perf_counter() - started, None))
+
+
+def report(results, elapsed: float) -> None:
+    statuses = Counter(status for status, _, _ in results)
+    ok = [r for r in results if r[0] == 200]
+    print(f"requests: {len(results)} in {elapsed:.1f}s ({len(results) / elapsed:.1f}/s)")
+    print("status:   " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
+    if not ok:
+        return
+    for label, values in (
+        ("latency", [r[1] for r in ok]),
+        ("ttfb", [r[2] for r in ok if r[2] is not None]),
+    ):
+        if not values:
+            continue
+        print(
+            f"{label + ':':9} mean={statistics.mean(values) * 1000:.0f}ms "
+            + " ".join(
+                f"p{p}={percentile(values, p) * 1000:.0f}ms" for p in (50, 90, 95, 99)
+            )
+            + f" max={max(values) * 1000:.0f}ms"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--concurrency", type=int, default=10, help="parallel clients")
+    parser.add_argument("--requests", type=int, default=200, help="total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=0, help="soak for this many seconds instead")
+    parser.add_argument("--stream", action="store_true", help="use /ask/stream instead of /ask")
+    parser.add_argument("--unique", action="store_true", help="make every question unique to bypass caching")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    args = parser.parse_args()
+
+    path = "/api/v1/rya/ask/stream" if args.stream else "/api/v1/rya/ask"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = []
+    counter = [0]
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        await asyncio.gather(
+            *(
+                worker(client, args, path, started + args.duration, counter, results)
+                for _ in range(args.concurrency)
+            )
+        )
+    report(results, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
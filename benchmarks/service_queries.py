@@ -0,0 +1,139 @@
+"""
+Measure the per-request statement overhead of the service read endpoints.
+
+For every hot query three ways of getting to SQL are timed, without a
+database:
+
+    rebuilt   build the statement and compile it (no compiled cache)
+    cached    build the statement, then hit the compiled cache by cache key
+              (what every request paid before the prebuilt statements)
+    prebuilt  reuse the statement from app.services.queries; its cache key
+              is memoized, so only the cache lookup is left
+
+With --execute each prebuilt query is also run against DATABASE_URL, once
+with asyncpg's prepared-statement cache and once in PgBouncer-safe mode
+(DATABASE_PGBOUNCER), where every execution is parsed and planned again.
+Run from the repository root:
+
+    PYTHONPATH=. python benchmarks/service_queries.py --iterations 20000
+    PYTHONPATH=. python benchmarks/service_queries.py --execute
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+from app.core.config import settings
+from app.models import Certification, Experience, PersonalInfo, Project, Skill
+from app.services import queries
+
+# endpoint -> (statement as built per request before, prebuilt statement, parameters)
+ENDPOINTS: Dict[str, Tuple[Callable[[], Any], Any, Dict[str, Any]]] = {
+    "GET /personal-info": (lambda: select(PersonalInfo).limit(1), queries.PERSONAL_INFO, {}),
+    "GET /skills": (lambda: select(Skill), queries.ALL_SKILLS, {}),
+    "GET /skills/{id}": (
+        lambda: select(Skill).where(Skill.id == uuid4()), queries.SKILL_BY_ID, {"id": uuid4()},
+    ),
+    "GET /certifications": (lambda: select(Certification), queries.ALL_CERTIFICATIONS, {}),
+    "GET /certifications/{id}": (
+        lambda: select(Certification).where(Certification.id == uuid4()),
+        queries.CERTIFICATION_BY_ID,
+        {"id": uuid4()},
+    ),
+    "GET /projects": (
+        lambda: select(Project).order_by(Project.created_at.desc()), queries.ALL_PROJECTS, {},
+    ),
+    "GET /projects/{id}": (
+        lambda: select(Project).where(Project.id == uuid4()), queries.PROJECT_BY_ID, {"id": uuid4()},
+    ),
+    "GET /experience": (
+        lambda: select(Experience).order_by(Experience.start_date.desc()), queries.ALL_EXPERIENCES, {},
+    ),
+    "GET /experience/{id}": (
+        lambda: select(Experience).where(Experience.id == uuid4()),
+        queries.EXPERIENCE_BY_ID,
+        {"id": uuid4()},
+    ),
+}
+
+
+def per_call_us(fn: Callable[[], Any], iterations: int) -> float:
+    """Median of five runs of ``iterations`` calls, in microseconds per call."""
+    runs = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        runs.append((time.perf_counter() - started) / iterations * 1e6)
+    return statistics.median(runs)
+
+
+def compile_overhead(iterations: int) -> None:
+    dialect = asyncpg_dialect()
+    print(f"{'endpoint':26} {'rebuilt':>9} {'cached':>9} {'prebuilt':>9}  (us per request)")
+    for name, (build, prebuilt, _) in ENDPOINTS.items():
+        cache: Dict[Any, Any] = {}
+
+        def lookup(statement) -> Any:
+            key = statement._generate_cache_key().key
+            compiled = cache.get(key)
+            if compiled is None:
+                compiled = cache[key] = statement.compile(dialect=dialect)
+            return compiled
+
+        rebuilt = per_call_us(lambda: build().compile(dialect=dialect), max(iterations // 20, 1))
+        cached = per_call_us(lambda: lookup(build()), iterations)
+        reused = per_call_us(lambda: lookup(prebuilt), iterations)
+        print(f"{name:26} {rebuilt:9.1f} {cached:9.1f} {reused:9.1f}")
+
+
+async def execution_time(pgbouncer: bool, iterations: int) -> Dict[str, float]:
+    # Imported here so the settings above apply to the engine's connect args
+    from app.core.database import _create_engine
+
+    settings.DATABASE_PGBOUNCER = pgbouncer
+    bench_engine = _create_engine(settings.DATABASE_URL, "bench")
+    timings: Dict[str, float] = {}
+    try:
+        async with bench_engine.connect() as conn:
+            for name, (_, prebuilt, params) in ENDPOINTS.items():
+                await conn.execute(prebuilt, params)  # prepare once
+                durations: List[float] = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    await conn.execute(prebuilt, params)
+                    durations.append(time.perf_counter() - started)
+                timings[name] = statistics.median(durations) * 1e6
+    finally:
+        await bench_engine.dispose()
+    return timings
+
+
+async def execute(iterations: int) -> None:
+    cached = await execution_time(False, iterations)
+    pgbouncer = await execution_time(True, iterations)
+    print(f"\n{'endpoint':26} {'prepared':>9} {'pgbouncer':>9}  (us per execution, median)")
+    for name in ENDPOINTS:
+        print(f"{name:26} {cached[name]:9.1f} {pgbouncer[name]:9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10000, help="calls per measurement")
+    parser.add_argument("--execute", action="store_true", help="also time execution against DATABASE_URL")
+    parser.add_argument("--executions", type=int, default=500, help="executions per query with --execute")
+    args = parser.parse_args()
+
+    compile_overhead(args.iterations)
+    if args.execute:
+        asyncio.run(execute(args.executions))
+
+
+if __name__ == "__main__":
+    main()
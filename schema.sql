@@ -114,16 +114,63 @@ CREATE INDEX ix_contact_requests_created_at ON contact_requests(created_at DESC)
 -- ============================================
 -- 8. AI CONTEXT LOGS TABLE
 -- ============================================
+-- Each distinct AI context is stored once, keyed by sha256 of its jsonb text
+CREATE TABLE context_snapshots (
+    hash VARCHAR(64) PRIMARY KEY,
+    context JSONB NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE ai_context_logs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_question TEXT NOT NULL,
     ai_response TEXT NOT NULL,
-    used_context JSONB,
+    used_context JSONB,  -- legacy inline copy, superseded by context_hash
+    context_hash VARCHAR(64) REFERENCES context_snapshots(hash),
+    prompt_tokens INTEGER,  -- estimated prompt size; NULL when no model call was made
+    client_hash VARCHAR(32),  -- keyed hash of the client (IP or API key), for FAQ mining
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE INDEX ix_ai_context_logs_created_at ON ai_context_logs(created_at DESC);
 
+-- ============================================
+-- 9. RYA DAILY ROLLUPS
+-- ============================================
+-- Per-day (UTC) totals, updated in the transaction that inserts each log batch
+CREATE TABLE ai_daily_stats (
+    day DATE PRIMARY KEY,
+    questions INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    answer_chars BIGINT NOT NULL DEFAULT 0,
+    ai_calls INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0
+);
+
+-- Per-day count of each distinct (normalized) question
+CREATE TABLE ai_daily_questions (
+    day DATE NOT NULL,
+    question_hash VARCHAR(64) NOT NULL,  -- sha256 of the normalized question
+    question TEXT NOT NULL,  -- first wording seen that day
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, question_hash)
+);
+
+-- ============================================
+-- 10. RYA FAQ ANSWERS
+-- ============================================
+-- Precomputed FAQ answers shared by every worker, per portfolio content
+CREATE TABLE ai_faq_answers (
+    content_key VARCHAR(32) NOT NULL,  -- content key of the portfolio data answered from
+    intent TEXT NOT NULL,  -- the intent's terms, sorted and space-separated
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (content_key, intent)
+);
+
+CREATE INDEX ix_ai_faq_answers_created_at ON ai_faq_answers(created_at);
+
 -- ============================================
 -- SAMPLE DATA (Optional - for testing)
 -- ============================================
@@ -0,0 +1,58 @@
+"""
+Tests for the bounded generation slots of AI providers.
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+
+from app.core.ai_client import AIOverloadedError, AIProvider
+
+
+class IdleProvider(AIProvider):
+    name = "idle"
+
+    async def _generate(self, prompt: str) -> str:
+        return "answer"
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        yield "answer"
+
+
+def test_slot_wait_times_out_without_leaking_permits():
+    provider = IdleProvider(max_concurrency=1, max_queue=5)
+
+    async def main():
+        async with provider._slot():
+            for _ in range(20):
+                with pytest.raises(asyncio.TimeoutError):
+                    async with provider._slot(timeout=0):
+                        pass
+        # Every permit is back: the full concurrency is available again
+        async with provider._slot(timeout=0.1):
+            assert provider._in_flight == 1
+
+    asyncio.run(main())
+    assert provider._queued == 0
+    assert provider._in_flight == 0
+    assert not provider._slots.locked()
+
+
+def test_slot_rejects_callers_beyond_the_queue():
+    provider = IdleProvider(max_concurrency=1, max_queue=1)
+
+    async def main():
+        async with provider._slot():
+            waiter = asyncio.ensure_future(provider._slot(timeout=1).__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(AIOverloadedError):
+                async with provider._slot():
+                    pass
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+    asyncio.run(main())
+    assert provider._queued == 0
+    assert not provider._slots.locked()
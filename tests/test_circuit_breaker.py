@@ -0,0 +1,188 @@
+"""
+Tests for the AI circuit breaker state machine and for which provider errors
+are retried and counted against it.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator
+
+import pytest
+
+from app.core.ai_client import (
+    AICircuitOpenError,
+    AIClientError,
+    AIProvider,
+    AIRejectedError,
+)
+from app.core.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+def open_breaker(threshold: int = 3, reset: float = 30) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", threshold, reset)
+    for _ in range(threshold):
+        breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", 3, 30)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.allow()
+    assert 0 < excinfo.value.retry_after <= 30
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("test", 3, 30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = open_breaker()
+    later = time.monotonic() + 31
+
+    breaker.allow(now=later)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow(now=later)
+
+
+def test_successful_probe_closes_the_circuit():
+    breaker = open_breaker()
+    breaker.allow(now=time.monotonic() + 31)
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = open_breaker()
+    breaker.allow(now=time.monotonic() + 31)
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_ignored_probe_lets_the_next_call_probe():
+    breaker = open_breaker()
+    later = time.monotonic() + 31
+    breaker.allow(now=later)
+    breaker.record_ignored()
+
+    assert breaker.state == HALF_OPEN
+    breaker.allow(now=later)
+
+
+def test_zero_threshold_disables_the_breaker():
+    breaker = CircuitBreaker("test", 0, 30)
+    for _ in range(10):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+class ScriptedProvider(AIProvider):
+    """Provider whose calls raise the given errors in turn, then answer."""
+
+    name = "scripted"
+
+    def __init__(self, errors, **kwargs):
+        kwargs.setdefault("timeout", 5)
+        kwargs.setdefault("retry_backoff", 0)
+        kwargs.setdefault("hedge_after", 0)
+        super().__init__(**kwargs)
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _classify(self, error: Exception) -> AIClientError:
+        if isinstance(error, ValueError):
+            return AIRejectedError(str(error))
+        return super()._classify(error)
+
+    async def _generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "answer"
+
+    async def _stream(self, prompt: str) -> AsyncIterator[str]:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        yield "answer"
+
+
+def ask(provider: AIProvider) -> str:
+    return asyncio.run(provider.generate_response("question", "context", "system"))
+
+
+def test_transient_errors_are_retried():
+    provider = ScriptedProvider([RuntimeError("503")], max_retries=2, breaker_threshold=5)
+
+    assert ask(provider) == "answer"
+    assert provider.calls == 2
+    assert provider.breaker.failures == 0
+
+
+def test_transient_failures_open_the_circuit():
+    provider = ScriptedProvider(
+        [RuntimeError("503")] * 4, max_retries=1, breaker_threshold=2, breaker_reset=30
+    )
+    for _ in range(2):
+        with pytest.raises(AIClientError):
+            ask(provider)
+
+    assert provider.breaker.state == OPEN
+    with pytest.raises(AICircuitOpenError):
+        ask(provider)
+    assert provider.calls == 4
+
+
+def test_rejected_requests_are_not_retried_or_counted():
+    provider = ScriptedProvider(
+        [ValueError("blocked")] * 5, max_retries=2, breaker_threshold=2
+    )
+    for _ in range(5):
+        with pytest.raises(AIRejectedError):
+            ask(provider)
+
+    assert provider.calls == 5
+    assert provider.breaker.state == CLOSED
+    assert provider.breaker.failures == 0
+    assert ask(provider) == "answer"
+
+
+def test_rejected_stream_is_not_counted():
+    provider = ScriptedProvider([ValueError("blocked")] * 3, breaker_threshold=2)
+
+    async def consume():
+        return [chunk async for chunk in provider.stream_response("q", "c", "s")]
+
+    for _ in range(3):
+        with pytest.raises(AIRejectedError):
+            asyncio.run(consume())
+    assert provider.breaker.state == CLOSED
@@ -0,0 +1,40 @@
+"""
+Tests for merging narrowed portfolio snapshots back into one context.
+"""
+
+from app.services.portfolio_snapshot import PortfolioSnapshot
+
+
+def make_snapshot(skills, projects, sections=("personal_info", "skills", "projects")):
+    return PortfolioSnapshot.from_context(
+        1,
+        {
+            "personal_info": {"name": "Ann"},
+            "skills": [{"name": name, "category": "Backend"} for name in skills],
+            "projects": [{"title": title, "project_type": "web"} for title in projects],
+        },
+        sections=sections,
+    )
+
+
+def test_merge_keeps_records_of_every_selection_in_snapshot_order():
+    snapshot = make_snapshot(["Python", "Go", "Rust"], ["Shop", "Blog"])
+    first = make_snapshot(["Rust"], [], sections=("personal_info", "skills"))
+    second = make_snapshot(["Python"], ["Blog"])
+
+    merged = snapshot.merge([first, second])
+
+    assert [r["name"] for r in merged.skills] == ["Python", "Rust"]
+    assert [r["title"] for r in merged.projects] == ["Blog"]
+    assert merged.content_key != snapshot.content_key
+
+
+def test_merge_keeps_whole_sections_and_leaves_out_unselected_ones():
+    snapshot = make_snapshot(["Python", "Go"], ["Shop"])
+    skills_only = make_snapshot(["Python", "Go"], [], sections=("personal_info", "skills"))
+
+    merged = snapshot.merge([skills_only])
+
+    assert merged.digests["skills"] == snapshot.digests["skills"]
+    assert merged.sections == frozenset({"personal_info", "skills"})
+    assert "projects" not in merged.to_context()
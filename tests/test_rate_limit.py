@@ -0,0 +1,196 @@
+"""
+Tests for the Rya admission control: token buckets, their LRU bound, client
+identification and the 429 responses of the middleware.
+"""
+
+import uuid
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.rate_limit import (
+    AdmissionMiddleware,
+    ConcurrencyGate,
+    TokenBucketLimiter,
+    charge,
+    client_key,
+    hash_api_key,
+)
+
+
+def make_client(limiter: TokenBucketLimiter, gate: ConcurrencyGate, api_keys=()) -> TestClient:
+    async def ask(request):
+        return PlainTextResponse("answer")
+
+    async def ask_batch(request):
+        charge(request.scope, limiter, int(request.query_params["questions"]) - 1)
+        return PlainTextResponse("answers")
+
+    app = Starlette(
+        routes=[
+            Route("/rya/ask", ask, methods=["POST"]),
+            Route("/rya/ask/batch", ask_batch, methods=["POST"]),
+            Route("/other", ask),
+        ]
+    )
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=limiter,
+        gate=gate,
+        path_prefixes=["/rya/ask"],
+        api_keys=api_keys,
+    )
+    return TestClient(app)
+
+
+def scope(headers=(), client=("10.0.0.1", 1234)):
+    return {"type": "http", "headers": list(headers), "client": client}
+
+
+class TestTokenBucketLimiter:
+    def test_burst_then_refill(self):
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=3, max_clients=10)
+        assert [limiter.acquire("a", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.acquire("a", now=0.0) == 1.0
+        # One token per second comes back
+        assert limiter.acquire("a", now=1.0) == 0.0
+        assert limiter.acquire("a", now=1.0) > 0
+
+    def test_retry_after_counts_down(self):
+        limiter = TokenBucketLimiter(rate_per_minute=30, burst=1, max_clients=10)
+        assert limiter.acquire("a", now=0.0) == 0.0
+        assert limiter.acquire("a", now=0.5) == 1.5
+
+    def test_clients_are_independent(self):
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=1, max_clients=10)
+        assert limiter.acquire("a", now=0.0) == 0.0
+        assert limiter.acquire("a", now=0.0) > 0
+        assert limiter.acquire("b", now=0.0) == 0.0
+
+    def test_cost(self):
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=5, max_clients=10)
+        assert limiter.acquire("a", now=0.0, cost=4) == 0.0
+        assert limiter.acquire("a", now=0.0, cost=2) == 1.0
+        assert limiter.acquire("a", now=0.0, cost=1) == 0.0
+
+    def test_cost_above_burst_takes_a_full_bucket(self):
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=3, max_clients=10)
+        assert limiter.acquire("a", now=0.0, cost=10) == 0.0
+        assert limiter.acquire("a", now=0.0) == 1.0
+
+    def test_disabled(self):
+        limiter = TokenBucketLimiter(rate_per_minute=0, burst=1, max_clients=10)
+        assert all(limiter.acquire("a", now=0.0) == 0.0 for _ in range(100))
+
+    def test_lru_bound_evicts_least_recently_used(self):
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=5, max_clients=2)
+        limiter.acquire("a", now=0.0)
+        limiter.acquire("b", now=0.1)
+        limiter.acquire("a", now=0.2)
+        limiter.acquire("c", now=0.3)
+        assert limiter.stats()["clients"] == 2
+        assert limiter.stats()["evicted"] == 1
+        assert set(limiter._buckets) == {"a", "c"}
+
+    def test_refilled_buckets_are_dropped_without_counting_evictions(self):
+        limiter = TokenBucketLimiter(rate_per_minute=60, burst=5, max_clients=2)
+        limiter.acquire("a", now=0.0)
+        limiter.acquire("b", now=0.0)
+        # Both buckets are full again after 5 seconds
+        limiter.acquire("c", now=10.0)
+        assert limiter.stats()["evicted"] == 0
+        assert set(limiter._buckets) == {"c"}
+
+
+class TestClientKey:
+    def test_ip_without_key(self):
+        assert client_key(scope()) == "ip:10.0.0.1"
+
+    def test_unknown_api_key_falls_back_to_ip(self):
+        allowed = {hash_api_key(b"secret")}
+        assert client_key(scope([(b"x-api-key", b"random")]), api_keys=allowed) == "ip:10.0.0.1"
+        assert client_key(scope([(b"x-api-key", b"random")])) == "ip:10.0.0.1"
+
+    def test_allowed_api_key(self):
+        allowed = {hash_api_key(b"secret")}
+        key = client_key(scope([(b"x-api-key", b"secret")]), api_keys=allowed)
+        assert key == "key:" + hash_api_key(b"secret")
+        assert "secret" not in key
+
+    def test_forwarded_for_only_when_trusted(self):
+        headers = [(b"x-forwarded-for", b"203.0.113.7")]
+        assert client_key(scope(headers)) == "ip:10.0.0.1"
+        assert client_key(scope(headers), forwarded_hops=1) == "ip:203.0.113.7"
+
+    def test_forwarded_for_ignores_client_supplied_entries(self):
+        # The client sent "1.2.3.4"; the trusted proxy appended its address
+        headers = [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.7")]
+        assert client_key(scope(headers), forwarded_hops=1) == "ip:203.0.113.7"
+        # Two proxies: the outer one appended the client, the inner one the outer
+        headers = [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.7, 10.0.0.2")]
+        assert client_key(scope(headers), forwarded_hops=2) == "ip:203.0.113.7"
+
+    def test_forwarded_for_with_too_few_entries_uses_peer(self):
+        headers = [(b"x-forwarded-for", b"203.0.113.7")]
+        assert client_key(scope(headers), forwarded_hops=2) == "ip:10.0.0.1"
+        assert client_key(scope(), forwarded_hops=1) == "ip:10.0.0.1"
+
+
+class TestAdmissionMiddleware:
+    def test_rate_limited_request_gets_429_with_retry_after(self):
+        client = make_client(
+            TokenBucketLimiter(rate_per_minute=6, burst=1, max_clients=10), ConcurrencyGate(0)
+        )
+        assert client.post("/rya/ask").status_code == 200
+        response = client.post("/rya/ask")
+        assert response.status_code == 429
+        assert 1 <= int(response.headers["Retry-After"]) <= 10
+        assert "detail" in response.json()
+
+    def test_other_paths_are_not_limited(self):
+        client = make_client(
+            TokenBucketLimiter(rate_per_minute=6, burst=1, max_clients=10), ConcurrencyGate(0)
+        )
+        assert all(client.get("/other").status_code == 200 for _ in range(5))
+
+    def test_random_api_keys_do_not_escape_the_limit(self):
+        limiter = TokenBucketLimiter(rate_per_minute=6, burst=2, max_clients=10)
+        client = make_client(limiter, ConcurrencyGate(0), api_keys=["secret"])
+        statuses = [
+            client.post("/rya/ask", headers={"X-API-Key": uuid.uuid4().hex}).status_code
+            for _ in range(5)
+        ]
+        assert statuses == [200, 200, 429, 429, 429]
+        assert limiter.stats()["clients"] == 1
+
+    def test_allowed_api_key_has_its_own_bucket(self):
+        client = make_client(
+            TokenBucketLimiter(rate_per_minute=6, burst=1, max_clients=10),
+            ConcurrencyGate(0),
+            api_keys=["secret"],
+        )
+        assert client.post("/rya/ask").status_code == 200
+        assert client.post("/rya/ask").status_code == 429
+        assert client.post("/rya/ask", headers={"X-API-Key": "secret"}).status_code == 200
+
+    def test_busy_gate_gets_429(self):
+        gate = ConcurrencyGate(1)
+        gate.try_acquire()
+        client = make_client(TokenBucketLimiter(rate_per_minute=0, burst=1, max_clients=10), gate)
+        response = client.post("/rya/ask")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        gate.release()
+        assert client.post("/rya/ask").status_code == 200
+        assert gate.in_flight == 0
+
+    def test_batch_is_charged_per_question(self):
+        client = make_client(
+            TokenBucketLimiter(rate_per_minute=6, burst=5, max_clients=10), ConcurrencyGate(0)
+        )
+        assert client.post("/rya/ask/batch?questions=4").status_code == 200
+        response = client.post("/rya/ask/batch?questions=4")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
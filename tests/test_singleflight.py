@@ -0,0 +1,70 @@
+"""
+Tests for single-flight call sharing and cancellation.
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(3)))
+
+    assert asyncio.run(main()) == [1, 1, 1]
+    assert flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+
+def test_caller_after_last_waiter_cancelled_starts_a_new_call():
+    flight = SingleFlight()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            # Cleanup that outlives the cancel, keeping the task unfinished
+            await asyncio.sleep(0.01)
+        return "stale"
+
+    async def fresh():
+        return "fresh"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # The cancelled call is still unwinding, but must not be joined
+        return await flight.do("key", fresh)
+
+    assert asyncio.run(main()) == "fresh"
+    assert flight.stats()["started"] == 2
+
+
+def test_remaining_waiter_keeps_the_call_running():
+    flight = SingleFlight()
+
+    async def fn():
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", fn))
+        second = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "answer"